@@ -1,14 +1,38 @@
 import os
+import re
+import json
+import base64
 import uuid
-import logging
+import wave
+import time
 import asyncio
+import logging
+
+from typing import List
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, WebSocket, WebSocketDisconnect, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from processing import SurroundingAwarenessProcessor
 from audio_processing import AudioProcessing, GLOBAL_TEXT_SUMMARY
+from artifact_store import ArtifactStore
+from job_queue import JobQueue, JobWorkerPool, FINISHED_STATUSES
+from live_scene import LiveSceneSession
+from frame_sampling import select_evenly
+from audio_codec import encode_audio
+import profiling
+from metrics import (
+    REGISTRY,
+    FRAMES,
+    LIVE_SCENE_SESSIONS,
+    REQUEST_DURATION,
+    REQUESTS_IN_FLIGHT,
+    run_in_executor,
+    server_timing_header,
+    start_request_timings,
+    timed,
+)
 
 # Set up logging for the API. Only errors will be printed.
 logging.basicConfig(level=logging.ERROR)
@@ -25,16 +49,172 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """
+    Track in-flight requests and request latency, and report the per-stage breakdown
+    of each request in a Server-Timing response header.
+    """
+    timings = start_request_timings()
+    REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["Server-Timing"] = server_timing_header(timings, time.perf_counter() - start)
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        # Label by route template (not the raw path) to keep the number of series bounded.
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        REQUEST_DURATION.observe(time.perf_counter() - start, path=path, status=status)
+
+async def profile_requests(request: Request, call_next):
+    """
+    Profile selected requests (admin header or sampling) across all executor threads and save
+    the collapsed-stack profile; the file name is returned in the X-Profile-Id header.
+    """
+    if not profiling.should_profile(request.headers):
+        return await call_next(request)
+    session = profiling.start_session(request.url.path)
+    response = None
+    try:
+        response = await call_next(request)
+        return response
+    finally:
+        try:
+            filename = await run_in_executor(profiling.save_session, session)
+            if response is not None:
+                response.headers["X-Profile-Id"] = filename
+        except Exception as e:
+            logger.error(f"Error saving request profile: {e}")
+
+# The profiling middleware is only installed when a trigger is configured, so it costs nothing otherwise.
+if profiling.ENABLED:
+    app.middleware("http")(profile_requests)
+
 # Initialize the processors (video and audio)
 processor = SurroundingAwarenessProcessor()
 audio_processor = AudioProcessing()
 
+# Generated audio responses are served from a bounded artifact store (TTL + size cap + LRU eviction).
+artifact_store = ArtifactStore(
+    root="temp_uploads",
+    default_ttl=float(os.getenv("ARTIFACT_TTL_SECONDS", "3600")),
+    max_bytes=int(os.getenv("ARTIFACT_MAX_BYTES", str(500 * 1024 * 1024))),
+    memory_max_item_bytes=int(os.getenv("ARTIFACT_MEMORY_MAX_ITEM_BYTES", str(256 * 1024))),
+    memory_max_bytes=int(os.getenv("ARTIFACT_MEMORY_MAX_BYTES", str(32 * 1024 * 1024))),
+    sweep_interval=float(os.getenv("ARTIFACT_SWEEP_INTERVAL_SECONDS", "60")),
+)
+
+@app.on_event("startup")
+async def start_artifact_sweeper():
+    artifact_store.start_sweeper()
+
+@app.on_event("shutdown")
+async def stop_artifact_sweeper():
+    artifact_store.stop_sweeper()
+
+# TTS output is re-encoded into a compact codec before it is served ("ogg" = Opus); empty keeps the raw file.
+RESPONSE_AUDIO_CODEC = os.getenv("RESPONSE_AUDIO_CODEC", "ogg").lower()
+RESPONSE_AUDIO_BITRATE = os.getenv("RESPONSE_AUDIO_BITRATE", "32k")
+
+@timed("encode")
+def finalize_audio(audio_url: str, inline: bool = False) -> dict:
+    """
+    Encode a generated '/download_audio/<name>' file into the compact response codec, hand it over
+    to the artifact store and return the audio fields for the response:
+    - url: the (possibly renamed) '/download_audio/...' path
+    - audio_base64 / audio_mime: the encoded audio itself, only when 'inline' is requested
+    Runs blocking work (ffmpeg, file reads), so call it from the executor.
+    """
+    name = os.path.basename(audio_url)
+    fields = {"url": f"/download_audio/{name}"}
+    try:
+        path = artifact_store.path_for(name)
+        if RESPONSE_AUDIO_CODEC and os.path.getsize(path) > 0:
+            encoded_name = f"{os.path.splitext(name)[0]}.{RESPONSE_AUDIO_CODEC}"
+            if encode_audio(path, artifact_store.path_for(encoded_name), RESPONSE_AUDIO_CODEC, RESPONSE_AUDIO_BITRATE):
+                os.remove(path)
+                name = encoded_name
+        artifact = artifact_store.put_file(name)
+        fields["url"] = f"/download_audio/{name}"
+        if inline:
+            data = artifact.data
+            if data is None:
+                with open(artifact.path, "rb") as f:
+                    data = f.read()
+            fields["audio_base64"] = base64.b64encode(data).decode("utf-8")
+            fields["audio_mime"] = artifact.media_type
+    except Exception as e:
+        logger.error(f"Error finalizing audio artifact: {e}")
+    return fields
+
+def apply_audio_fields(response: dict, url_key: str, fields: dict) -> dict:
+    """
+    Store the finalized audio URL under 'url_key' and add any inline audio to the response.
+    """
+    response[url_key] = fields.pop("url")
+    response.update(fields)
+    return response
+
+# Upper bound on keyframes read from one /process_frames/ request. Uploads are thinned evenly, once,
+# to the smaller of this cap and the processor's frame budget (FRAME_BUDGET).
+MAX_INGEST_FRAMES = int(os.getenv("MAX_INGEST_FRAMES", "16"))
+
+def run_scene_summary(video_process_result: dict, file_id: str, inline_audio: bool = False, set_stage=None) -> dict:
+    """
+    Shared tail of the video pipelines: summarize the combined caption/OCR text with the LLM,
+    synthesize the summary to audio and update the global text summary.
+    With 'inline_audio' the encoded audio is embedded in the response as base64.
+    'set_stage' (optional) is called with the name of each stage as it starts, for job progress.
+    Blocking; call it from the executor or a job worker.
+    """
+    set_stage = set_stage or (lambda name: None)
+    temp_dir = "temp_uploads"
+    os.makedirs(temp_dir, exist_ok=True)
+    combined_text = video_process_result.get("combined_text", "")
+    if not combined_text:
+        raise HTTPException(status_code=500, detail="Failed to extract content from video.")
+
+    set_stage("summarizing")
+    llm_summary = processor.generate_llm_summary(combined_text)
+    if not llm_summary:
+        raise HTTPException(status_code=500, detail="LLM summarization failed.")
+    
+    set_stage("synthesizing_audio")
+    audio_output_path = os.path.join(temp_dir, f"{file_id}_output.mp3")
+    audio_success = processor.generate_audio(llm_summary, audio_output_path)
+    if not audio_success:
+        raise HTTPException(status_code=500, detail="Audio generation failed.")
+    set_stage("encoding_audio")
+    audio_fields = finalize_audio(audio_output_path, inline_audio)
+
+    # Update global text summary store; each new video overwrites the previous summary.
+    GLOBAL_TEXT_SUMMARY["latest"] = llm_summary
+    # Keep the per-frame captions and OCR text for later questions about this (or an earlier) recording.
+    try:
+        audio_processor.scene_memory.add_recording(file_id, video_process_result.get("frame_details", []), llm_summary)
+    except Exception as e:
+        logger.error(f"Error storing scene memory: {e}")
+
+    response = {
+        "text_summary": llm_summary,
+    }
+    return apply_audio_fields(response, "audio_file", audio_fields)
+
+async def summarize_scene(video_process_result: dict, file_id: str, inline_audio: bool = False) -> dict:
+    return await run_in_executor(run_scene_summary, video_process_result, file_id, inline_audio)
+
 @app.post("/process_video/")
-async def process_video(file: UploadFile = File(...)):
+async def process_video(file: UploadFile = File(...), inline_audio: bool = False):
     """
     Accept a video file, process it through the pipeline, and return the generated text summary 
-    and audio file (MP3). Also, update the global text summary so that the audio processing 
+    and audio file. Also, update the global text summary so that the audio processing 
     endpoint has access to the latest video summary.
+    Pass inline_audio=true to receive the encoded audio in the same response (audio_base64/audio_mime).
     """
     temp_dir = "temp_uploads"
     os.makedirs(temp_dir, exist_ok=True)
@@ -47,29 +227,10 @@ async def process_video(file: UploadFile = File(...)):
             content = await file.read()
             f.write(content)
         
-        loop = asyncio.get_event_loop()
-        video_process_result = await loop.run_in_executor(None, processor.process_video, temp_file_path)
-        combined_text = video_process_result.get("combined_text", "")
-        if not combined_text:
-            raise HTTPException(status_code=500, detail="Failed to extract content from video.")
-
-        llm_summary = await loop.run_in_executor(None, processor.generate_llm_summary, combined_text)
-        if not llm_summary:
-            raise HTTPException(status_code=500, detail="LLM summarization failed.")
-        
-        audio_output_path = os.path.join(temp_dir, f"{file_id}_output.mp3")
-        audio_success = await loop.run_in_executor(None, processor.generate_audio, llm_summary, audio_output_path)
-        if not audio_success:
-            raise HTTPException(status_code=500, detail="Audio generation failed.")
-
-        # Update global text summary store; each new video overwrites the previous summary.
-        GLOBAL_TEXT_SUMMARY["latest"] = llm_summary
-
-        response = {
-            "text_summary": llm_summary,
-            "audio_file": f"/download_audio/{file_id}_output.mp3"
-        }
-        return response
+        video_process_result = await run_in_executor(processor.process_video, temp_file_path)
+        return await summarize_scene(video_process_result, file_id, inline_audio)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in processing video API: {e}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
@@ -80,15 +241,159 @@ async def process_video(file: UploadFile = File(...)):
         except Exception as e:
             logger.warning(f"Error cleaning up temporary file: {e}")
 
+@app.post("/process_frames/")
+async def process_frames(files: List[UploadFile] = File(...), inline_audio: bool = False):
+    """
+    Accept keyframes (JPEG images) selected on the client and run them straight through the
+    caption/OCR stages, skipping video upload and frame extraction. Returns the same response
+    as /process_video/.
+    """
+    # Clients configured with more keyframes than the cap are thinned (first and last kept), not rejected.
+    selected = select_evenly(files, min(MAX_INGEST_FRAMES, processor.frame_sampler.max_frames))
+    FRAMES.inc(len(files) - len(selected), outcome="skipped")
+    files = selected
+    file_id = str(uuid.uuid4())
+
+    try:
+        images = [await file.read() for file in files]
+        frames = await run_in_executor(processor.decode_frames, images)
+        if not frames:
+            raise HTTPException(status_code=400, detail="No valid frames were uploaded.")
+        frames_process_result = await run_in_executor(processor.process_frames, frames)
+        return await summarize_scene(frames_process_result, file_id, inline_audio)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in processing frames API: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
+
+# Asynchronous video jobs: uploads are queued in a persistent sqlite queue and processed by a
+# small worker pool, so clients are no longer tied to one long-running HTTP request.
+JOBS_DIR = os.getenv("JOBS_DIR", "jobs")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_EVENTS_POLL_SECONDS = 0.5
+
+job_queue = JobQueue(db_path=os.path.join(JOBS_DIR, "jobs.db"), lease_seconds=JOB_LEASE_SECONDS)
+
+def run_video_job(job: dict, set_stage) -> dict:
+    """
+    Job handler for 'process_video': the same pipeline as /process_video/, reporting stage progress.
+    """
+    set_stage("analyzing_frames")
+    video_process_result = processor.process_video(job["input_path"])
+    return run_scene_summary(video_process_result, job["id"], job["options"].get("inline_audio", False), set_stage)
+
+job_workers = JobWorkerPool(job_queue, {"process_video": run_video_job}, workers=JOB_WORKERS)
+
+@app.on_event("startup")
+async def start_job_workers():
+    # Jobs orphaned by a stopped process are requeued; jobs leased by live sibling workers are left alone.
+    job_workers.start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    job_workers.stop()
+
+def public_job(job: dict) -> dict:
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "result": job["result"],
+        "error": job["error"],
+    }
+
+@app.post("/jobs/process_video/", status_code=202)
+async def submit_video_job(file: UploadFile = File(...), inline_audio: bool = False):
+    """
+    Queue a video for processing and return immediately with a job id.
+    Poll GET /jobs/{job_id} or subscribe to GET /jobs/{job_id}/events for progress; the finished
+    job's 'result' holds the same JSON returned by /process_video/.
+    """
+    upload_dir = os.path.join(JOBS_DIR, "uploads")
+    os.makedirs(upload_dir, exist_ok=True)
+    input_path = os.path.join(upload_dir, f"{uuid.uuid4()}_{os.path.basename(file.filename or 'video')}")
+
+    try:
+        with open(input_path, "wb") as f:
+            content = await file.read()
+            f.write(content)
+        job_id = await run_in_executor(job_queue.submit, "process_video", input_path, {"inline_audio": inline_audio})
+        for stale_path in await run_in_executor(job_queue.purge, JOB_RETENTION_SECONDS):
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+    except Exception as e:
+        logger.error(f"Error in submitting video job: {e}")
+        if os.path.exists(input_path):
+            os.remove(input_path)
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events",
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Return the status, current stage and (once done) result or error of a job.
+    """
+    job = await run_in_executor(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return public_job(job)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """
+    Server-Sent Events stream of a job's progress: one 'status' event per stage change,
+    ending with the event carrying the final result or error.
+    """
+    job = await run_in_executor(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last_state = None
+        current = job
+        while True:
+            state = (current["status"], current["stage"])
+            if state != last_state:
+                last_state = state
+                yield f"event: status\ndata: {json.dumps(public_job(current))}\n\n"
+            if current["status"] in FINISHED_STATUSES or await request.is_disconnected():
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+            current = await run_in_executor(job_queue.get, job_id)
+            if current is None:
+                return
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+def bypass_response_cache(no_cache: bool, headers) -> bool:
+    """
+    A request skips the General-answer cache with no_cache=true or a 'Cache-Control: no-cache' header.
+    """
+    return no_cache or "no-cache" in headers.get("cache-control", "").lower()
+
 @app.post("/process_audio/")
-async def process_audio(file: UploadFile = File(...)):
+async def process_audio(request: Request, file: UploadFile = File(...), inline_audio: bool = False, no_cache: bool = False):
     """
     Accept an audio file, process it through the audio processing pipeline, and return:
     - data1: The intent recognition JSON
     - data2: The generated text response
     - data3: The path to the TTS-generated audio file
     - transcript: The STT-generated transcript (for debugging)
+    - audio_base64 / audio_mime: the encoded audio itself, when inline_audio=true
+    Cached answers to repeated General questions are reused unless no_cache=true (or Cache-Control: no-cache).
     """
+    use_cache = not bypass_response_cache(no_cache, request.headers)
     temp_dir = "temp_uploads"
     os.makedirs(temp_dir, exist_ok=True)
     file_id = str(uuid.uuid4())
@@ -100,9 +405,9 @@ async def process_audio(file: UploadFile = File(...)):
             content = await file.read()
             f.write(content)
         
-        loop = asyncio.get_event_loop()
-        audio_result = await loop.run_in_executor(None, audio_processor.process_audio, temp_file_path)
-        return audio_result
+        audio_result = await run_in_executor(audio_processor.process_audio, temp_file_path, use_cache)
+        audio_fields = await run_in_executor(finalize_audio, audio_result["data3"], inline_audio)
+        return apply_audio_fields(audio_result, "data3", audio_fields)
     except Exception as e:
         logger.error(f"Error in processing audio API: {e}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
@@ -113,12 +418,269 @@ async def process_audio(file: UploadFile = File(...)):
         except Exception as e:
             logger.warning(f"Error cleaning up temporary file: {e}")
 
+# Upper bound on a streamed utterance, to keep a misbehaving client from growing the buffer forever.
+# The byte cap is fixed (at the highest supported rate) so it does not depend on what the client announces.
+MAX_STREAM_SECONDS = 60
+SUPPORTED_SAMPLE_RATES = (8000, 48000)  # inclusive range of accepted 16-bit mono PCM rates
+MAX_STREAM_BYTES = MAX_STREAM_SECONDS * SUPPORTED_SAMPLE_RATES[1] * 2
+
+@app.websocket("/ws/process_audio/")
+async def process_audio_stream(websocket: WebSocket):
+    """
+    Accept raw 16-bit mono PCM audio streamed while the user is still speaking, and run the
+    audio processing pipeline as soon as the client signals end of speech.
+    Protocol:
+    - optional text message {"type": "start", "sample_rate": 16000, "inline_audio": true, "no_cache": false}
+    - binary messages containing PCM chunks
+    - text message {"type": "end"} to start processing, or {"type": "cancel"} to abort
+    The reply is the same JSON returned by /process_audio/, after which the connection is closed.
+    """
+    await websocket.accept()
+    temp_dir = "temp_uploads"
+    os.makedirs(temp_dir, exist_ok=True)
+    file_id = str(uuid.uuid4())
+    temp_file_path = os.path.join(temp_dir, f"{file_id}_stream.wav")
+    sample_rate = 16000
+    inline_audio = False
+    use_cache = not bypass_response_cache(False, websocket.headers)
+    pcm = bytearray()
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                pcm.extend(message["bytes"])
+                if len(pcm) > MAX_STREAM_BYTES:
+                    await websocket.send_json({"error": "Audio stream too long."})
+                    await websocket.close(code=1009)
+                    return
+                continue
+            control = json.loads(message.get("text") or "{}")
+            if control.get("type") == "start":
+                try:
+                    sample_rate = int(control.get("sample_rate", sample_rate))
+                except (TypeError, ValueError):
+                    sample_rate = 0
+                if not SUPPORTED_SAMPLE_RATES[0] <= sample_rate <= SUPPORTED_SAMPLE_RATES[1]:
+                    await websocket.send_json({"error": f"Unsupported sample rate; use {SUPPORTED_SAMPLE_RATES[0]}-{SUPPORTED_SAMPLE_RATES[1]} Hz."})
+                    await websocket.close(code=1003)
+                    return
+                inline_audio = bool(control.get("inline_audio", False))
+                use_cache = use_cache and not control.get("no_cache", False)
+            elif control.get("type") == "cancel":
+                await websocket.close()
+                return
+            elif control.get("type") == "end":
+                break
+
+        # End of speech: hand the buffered audio to the pipeline straight away.
+        with wave.open(temp_file_path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(sample_rate)
+            wf.writeframes(bytes(pcm))
+
+        audio_result = await run_in_executor(audio_processor.process_audio, temp_file_path, use_cache)
+        audio_fields = await run_in_executor(finalize_audio, audio_result["data3"], inline_audio)
+        await websocket.send_json(apply_audio_fields(audio_result, "data3", audio_fields))
+        await websocket.close()
+    except WebSocketDisconnect:
+        return
+    except Exception as e:
+        logger.error(f"Error in streaming audio API: {e}")
+        try:
+            await websocket.send_json({"error": f"Internal Server Error: {e}"})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        try:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+        except Exception as e:
+            logger.warning(f"Error cleaning up temporary file: {e}")
+
+# Live-scene mode: frames streamed over one connection; only frames that changed are processed.
+MAX_LIVE_FRAME_BYTES = 2 * 1024 * 1024
+
+def live_scene_message(update: dict, speak: bool, inline_audio: bool) -> dict:
+    """
+    Turn a live-scene summary update into the message pushed to the client and make it the latest
+    summary. With 'speak', the change (or the whole summary, for the first update) is synthesized.
+    Blocking; call it from the executor.
+    """
+    GLOBAL_TEXT_SUMMARY["latest"] = update["text_summary"]
+    message = dict(update, type="summary")
+    spoken = update["change"] if update["update"] > 1 else update["text_summary"]
+    if speak and spoken:
+        temp_dir = "temp_uploads"
+        os.makedirs(temp_dir, exist_ok=True)
+        audio_output_path = os.path.join(temp_dir, f"{uuid.uuid4()}_live.mp3")
+        if processor.generate_audio(spoken, audio_output_path):
+            apply_audio_fields(message, "audio_file", finalize_audio(audio_output_path, inline_audio))
+    return message
+
+@app.websocket("/ws/live_scene/")
+async def live_scene_stream(websocket: WebSocket):
+    """
+    Live-scene mode: the client streams low-rate JPEG frames while the user moves around and
+    receives the scene summary each time it is revised.
+    Protocol:
+    - optional text message {"type": "start", "speak": true, "inline_audio": true}
+    - binary messages containing one JPEG frame each
+    - text message {"type": "stop"} to end the session
+    Pushed messages: {"type": "summary", "text_summary", "change", "update"} (plus the audio fields
+    when speaking) after each revision, {"type": "error", "error"}, and finally
+    {"type": "stopped", "frames_received", "frames_processed", "updates"}.
+    Frames arriving while another one is being processed replace each other, so the next frame
+    processed is always the latest one.
+    """
+    await websocket.accept()
+    session = LiveSceneSession(processor, audio_processor.scene_memory, session_id=f"live-{uuid.uuid4()}")
+    options = {"speak": False, "inline_audio": False}
+    latest = []  # At most one frame waiting to be processed
+    frame_ready = asyncio.Event()
+    LIVE_SCENE_SESSIONS.inc()
+
+    async def process_latest_frames():
+        while True:
+            await frame_ready.wait()
+            frame_ready.clear()
+            image = latest.pop()
+            try:
+                frames = await run_in_executor(processor.decode_frames, [image])
+                update = await run_in_executor(session.add_frame, frames[0]) if frames else None
+                if update is not None:
+                    message = await run_in_executor(live_scene_message, update, options["speak"], options["inline_audio"])
+                    await websocket.send_json(message)
+            except Exception as e:
+                logger.error(f"Error in live scene processing: {e}")
+                try:
+                    await websocket.send_json({"type": "error", "error": f"Internal Server Error: {e}"})
+                except Exception:
+                    return
+
+    worker = asyncio.create_task(process_latest_frames())
+    disconnected = False
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                disconnected = True
+                break
+            if message.get("bytes") is not None:
+                if len(message["bytes"]) > MAX_LIVE_FRAME_BYTES:
+                    await websocket.send_json({"type": "error", "error": "Frame too large."})
+                    continue
+                if latest:
+                    latest[0] = message["bytes"]
+                    FRAMES.inc(outcome="dropped")
+                else:
+                    latest.append(message["bytes"])
+                frame_ready.set()
+                continue
+            control = json.loads(message.get("text") or "{}")
+            if control.get("type") == "start":
+                options["speak"] = bool(control.get("speak", False))
+                options["inline_audio"] = bool(control.get("inline_audio", False))
+            elif control.get("type") == "stop":
+                break
+    except WebSocketDisconnect:
+        disconnected = True
+    except Exception as e:
+        logger.error(f"Error in live scene API: {e}")
+    finally:
+        worker.cancel()
+        LIVE_SCENE_SESSIONS.dec()
+        # Waits for a frame still being processed; unsummarized observations go to the scene memory.
+        stats = await run_in_executor(session.close)
+
+    if not disconnected:
+        try:
+            await websocket.send_json(dict(stats, type="stopped"))
+            await websocket.close()
+        except Exception:
+            pass
+
+def parse_range(range_header: str, size: int):
+    """
+    Parse a single 'bytes=start-end' (or 'bytes=-suffix') Range header.
+    Returns (start, end) inclusive, or None if the header is not a satisfiable single range.
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+    if not match or (not match.group(1) and not match.group(2)) or size == 0:
+        return None
+    if match.group(1):
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else size - 1
+    else:
+        start = max(0, size - int(match.group(2)))
+        end = size - 1
+    end = min(end, size - 1)
+    if start > end:
+        return None
+    return start, end
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics: per-stage duration histograms, frame counters, executor queue depth
+    and in-flight requests.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/profiles/")
+async def list_profiles(request: Request):
+    """
+    List saved request profiles (newest first). Requires the profiling admin header.
+    """
+    if not profiling.is_admin(request.headers):
+        raise HTTPException(status_code=403, detail="Profiling admin token required")
+    return {"profiles": profiling.list_profiles()}
+
+@app.get("/profiles/{profile_name}")
+async def download_profile(profile_name: str, request: Request):
+    """
+    Download a saved profile in collapsed-stack format (flamegraph.pl / speedscope compatible).
+    """
+    if not profiling.is_admin(request.headers):
+        raise HTTPException(status_code=403, detail="Profiling admin token required")
+    path = profiling.profile_path(profile_name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path=path, filename=profile_name, media_type="text/plain")
+
 @app.get("/download_audio/{audio_filename}")
-async def download_audio(audio_filename: str):
+async def download_audio(audio_filename: str, request: Request):
     """
-    Endpoint to download the generated audio file.
+    Endpoint to download the generated audio file from the artifact store.
+    Supports single HTTP byte ranges so players can seek and resume.
     """
-    file_path = os.path.join("temp_uploads", audio_filename)
-    if not os.path.exists(file_path):
+    artifact = artifact_store.get(audio_filename)
+    if artifact is None:
         raise HTTPException(status_code=404, detail="Audio file not found")
-    return FileResponse(path=file_path, filename=audio_filename, media_type='audio/mpeg')
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{audio_filename}"',
+    }
+
+    range_header = request.headers.get("range")
+    if range_header:
+        byte_range = parse_range(range_header, artifact.size)
+        if byte_range is None:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{artifact.size}"})
+        start, end = byte_range
+        if artifact.data is not None:
+            content = artifact.data[start:end + 1]
+        else:
+            with open(artifact.path, "rb") as f:
+                f.seek(start)
+                content = f.read(end - start + 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{artifact.size}"
+        return Response(content=content, status_code=206, media_type=artifact.media_type, headers=headers)
+
+    if artifact.data is not None:
+        return Response(content=artifact.data, media_type=artifact.media_type, headers=headers)
+    return FileResponse(path=artifact.path, media_type=artifact.media_type, headers=headers)
@@ -0,0 +1,239 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from audio_codec import mime_type_for
+
+# Set up logging (only errors and warnings are shown)
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class Artifact:
+    def __init__(self, name: str, size: int, expires_at: float, path: str = None, data: bytes = None):
+        self.name = name
+        self.size = size
+        self.expires_at = expires_at
+        self.path = path    # Set for artifacts kept on disk
+        self.data = data    # Set for artifacts (also) cached in memory
+        self.media_type = mime_type_for(name)
+
+
+class ArtifactStore:
+    def __init__(
+        self,
+        root: str = "temp_uploads",
+        default_ttl: float = 3600,
+        max_bytes: int = 500 * 1024 * 1024,
+        memory_max_item_bytes: int = 256 * 1024,
+        memory_max_bytes: int = 32 * 1024 * 1024,
+        sweep_interval: float = 60,
+    ):
+        """
+        Bounded store for generated artifacts (TTS responses) served by /download_audio/.
+        - Every artifact has a TTL after which it is deleted.
+        - Disk artifacts are capped at 'max_bytes' in total; the least recently used are evicted first.
+        - Artifacts up to 'memory_max_item_bytes' are also cached in memory (capped at
+          'memory_max_bytes'); the file stays on disk. Set memory_max_item_bytes to 0 to disable it.
+        - 'root' is the source of truth: names this process does not know (e.g. written by another
+          API worker sharing the directory) are served from disk, with a TTL counted from the file's
+          modification time. The size cap only covers the artifacts registered in this process.
+        - A background sweeper enforces the limits and also removes untracked files in 'root'
+          (e.g. left over from a previous run or a crashed request) once they are older than the TTL.
+        """
+        self.root = root
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.memory_max_item_bytes = memory_max_item_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self.sweep_interval = sweep_interval
+        self._disk = OrderedDict()    # name -> Artifact, least recently used first
+        self._memory = OrderedDict()  # name -> Artifact, least recently used first
+        self._disk_bytes = 0
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._stop = threading.Event()
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def put_file(self, name: str, ttl: float = None) -> Artifact:
+        """
+        Register a file that was written to 'root' under 'name'.
+        Small files are also cached in memory; the file is kept for the other workers.
+        """
+        path = self.path_for(name)
+        size = os.path.getsize(path)
+        expires_at = time.time() + (ttl if ttl is not None else self.default_ttl)
+        artifact = Artifact(name, size, expires_at, path=path)
+        with self._lock:
+            self._discard(name)
+            self._disk[name] = artifact
+            self._disk_bytes += size
+            evicted = self._evict_disk()
+        self._remove_files(evicted)
+
+        if 0 < size <= self.memory_max_item_bytes:
+            with open(path, "rb") as f:
+                data = f.read()
+            cached = Artifact(name, size, expires_at, path=path, data=data)
+            with self._lock:
+                if self._disk.get(name) is artifact:
+                    self._memory[name] = cached
+                    self._memory_bytes += size
+                    self._evict_memory()
+            return cached
+        return artifact
+
+    def put_bytes(self, name: str, data: bytes, ttl: float = None) -> Artifact:
+        """
+        Store an artifact directly in the in-memory tier.
+        """
+        expires_at = time.time() + (ttl if ttl is not None else self.default_ttl)
+        artifact = Artifact(name, len(data), expires_at, data=data)
+        with self._lock:
+            self._discard(name)
+            self._memory[name] = artifact
+            self._memory_bytes += artifact.size
+            self._evict_memory()
+        return artifact
+
+    def get(self, name: str):
+        """
+        Return the artifact (marking it as recently used) or None if it is unknown or expired.
+        Names not registered in this process are looked up in 'root'.
+        """
+        expired = None
+        with self._lock:
+            artifact = self._memory.get(name) or self._disk.get(name)
+            if artifact is None:
+                return self._shared(name)
+            if artifact.expires_at <= time.time():
+                expired = self._discard(name)
+            else:
+                for tier in (self._memory, self._disk):
+                    if name in tier:
+                        tier.move_to_end(name)
+        if expired is not None:
+            self._remove_files([expired])
+            return None
+        if artifact.data is None and not os.path.exists(artifact.path):
+            # Removed by another worker (e.g. its sweeper).
+            self.delete(name)
+            return None
+        return artifact
+
+    def _shared(self, name: str):
+        """
+        Artifact for a file in 'root' that another process registered, or None.
+        """
+        if not name or name != os.path.basename(name) or name.startswith("."):
+            return None
+        path = self.path_for(name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        expires_at = stat.st_mtime + self.default_ttl
+        if expires_at <= time.time():
+            return None
+        return Artifact(name, stat.st_size, expires_at, path=path)
+
+    def delete(self, name: str):
+        with self._lock:
+            artifact = self._discard(name)
+        if artifact is not None:
+            self._remove_files([artifact])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "disk_items": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+            }
+
+    def sweep(self):
+        """
+        Remove expired artifacts, enforce the size caps and delete stale untracked files.
+        """
+        now = time.time()
+        with self._lock:
+            expired_names = {a.name for a in list(self._disk.values()) + list(self._memory.values()) if a.expires_at <= now}
+            expired = [self._discard(name) for name in expired_names]
+            evicted = self._evict_disk()
+            tracked = set(self._disk)
+        self._remove_files(expired + evicted)
+
+        try:
+            with os.scandir(self.root) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name not in tracked and entry.stat().st_mtime + self.default_ttl <= now:
+                        self._remove_file(entry.path)
+        except FileNotFoundError:
+            os.makedirs(self.root, exist_ok=True)
+
+    def start_sweeper(self):
+        """
+        Run 'sweep' periodically on a daemon thread.
+        """
+        if self._sweeper is not None:
+            return
+
+        def run():
+            while not self._stop.wait(self.sweep_interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    logger.error(f"Error sweeping artifact store: {e}")
+
+        self._sweeper = threading.Thread(target=run, daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop.set()
+
+    # The helpers below expect self._lock to be held by the caller, except for file removal.
+
+    def _discard(self, name: str):
+        cached = self._memory.pop(name, None)
+        if cached is not None:
+            self._memory_bytes -= cached.size
+        artifact = self._disk.pop(name, None)
+        if artifact is not None:
+            self._disk_bytes -= artifact.size
+        return artifact or cached
+
+    def _evict_memory(self):
+        # Evicted entries only lose their cached bytes; files stay tracked in the disk tier.
+        while self._memory_bytes > self.memory_max_bytes and self._memory:
+            _, oldest = self._memory.popitem(last=False)
+            self._memory_bytes -= oldest.size
+
+    def _evict_disk(self) -> list:
+        evicted = []
+        while self._disk_bytes > self.max_bytes and self._disk:
+            _, oldest = self._disk.popitem(last=False)
+            self._disk_bytes -= oldest.size
+            cached = self._memory.pop(oldest.name, None)
+            if cached is not None:
+                self._memory_bytes -= cached.size
+            evicted.append(oldest)
+        return evicted
+
+    def _remove_files(self, artifacts: list):
+        for artifact in artifacts:
+            if artifact.path is not None:
+                self._remove_file(artifact.path)
+
+    def _remove_file(self, path: str):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception as e:
+            logger.warning(f"Could not remove artifact file {path}: {e}")
@@ -0,0 +1,58 @@
+import os
+import shutil
+import logging
+import subprocess
+
+# Set up logging (only errors and warnings are shown)
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Supported compact codecs: file extension -> (ffmpeg codec arguments, MIME type).
+# Every entry is also an upload format accepted by Whisper.
+CODECS = {
+    "ogg": (["-c:a", "libopus", "-b:a", "{bitrate}", "-application", "voip"], "audio/ogg"),
+    "flac": (["-c:a", "flac"], "audio/flac"),
+    "mp3": (["-c:a", "libmp3lame", "-b:a", "{bitrate}"], "audio/mpeg"),
+}
+
+
+def ffmpeg_available() -> bool:
+    """
+    Return True if an ffmpeg binary is available on the PATH.
+    """
+    return shutil.which("ffmpeg") is not None
+
+
+def mime_type_for(path: str) -> str:
+    """
+    Return the MIME type for an audio file based on its extension.
+    """
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    if extension in CODECS:
+        return CODECS[extension][1]
+    if extension == "wav":
+        return "audio/wav"
+    return "application/octet-stream"
+
+
+def encode_audio(input_path: str, output_path: str, codec: str = "ogg", bitrate: str = "24k") -> bool:
+    """
+    Re-encode an audio file into a compact codec using ffmpeg.
+    Returns True on success. On any failure (unknown codec, missing ffmpeg, encoder error)
+    False is returned and the caller should keep using the original file.
+    """
+    if codec not in CODECS:
+        logger.error(f"Unsupported audio codec: {codec}")
+        return False
+    if not ffmpeg_available():
+        logger.warning("ffmpeg not found; skipping audio re-encoding.")
+        return False
+
+    codec_args = [arg.format(bitrate=bitrate) for arg in CODECS[codec][0]]
+    command = ["ffmpeg", "-y", "-loglevel", "error", "-i", input_path, "-ac", "1", *codec_args, output_path]
+    try:
+        subprocess.run(command, check=True, capture_output=True, timeout=30)
+        return os.path.exists(output_path) and os.path.getsize(output_path) > 0
+    except Exception as e:
+        logger.error(f"Error encoding audio to {codec}: {e}")
+        return False
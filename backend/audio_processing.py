@@ -9,6 +9,12 @@ import requests  # in case needed
 from openai import OpenAI
 from langchain_groq import ChatGroq
 
+from voice_activity import VoiceActivityDetector, trim_silence
+from audio_codec import encode_audio
+from metrics import timed, stage
+from scene_memory import SceneMemory
+from response_cache import ResponseCache
+
 # Load environment variables
 load_dotenv()
 
@@ -16,7 +22,7 @@ load_dotenv()
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
-# Global text summary store
+# Global text summary store (latest video only; queries use the scene memory below)
 GLOBAL_TEXT_SUMMARY = {"latest": ""}
 
 class AudioProcessing:
@@ -52,12 +58,58 @@ class AudioProcessing:
             logger.error(f"Failed to initialize TTS engine: {e}")
             raise
 
+        # Local preprocessing before Whisper: silence trimming / VAD and optional re-encoding.
+        # STT_COMPACT_CODEC can be "ogg", "flac" or "mp3"; leave empty to upload the trimmed WAV.
+        self.vad_enabled = os.getenv("STT_VAD_ENABLED", "true").lower() == "true"
+        self.stt_codec = os.getenv("STT_COMPACT_CODEC", "").lower()
+        self.stt_bitrate = os.getenv("STT_COMPACT_BITRATE", "24k")
+        self.vad = VoiceActivityDetector()
+
+        # Captions and OCR text of past recordings; Tavi queries retrieve only the relevant snippets.
+        self.scene_memory = SceneMemory()
+
+        # Answers to repeated General questions (text and TTS audio), keyed on the normalized transcript.
+        self.response_cache = ResponseCache()
+
+    @timed("stt_preprocess")
+    def prepare_audio_for_stt(self, audio_path: str) -> dict:
+        """
+        Trim leading/trailing silence and optionally re-encode the audio to a compact codec.
+        Returns a dictionary with 'has_speech', 'path' (the file to upload) and 'temp_files'
+        (derived files the caller should remove once the upload is done).
+        """
+        temp_files = []
+        upload_path = audio_path
+        if self.vad_enabled:
+            trimmed_path = f"{audio_path}_trimmed.wav"
+            vad_result = trim_silence(audio_path, trimmed_path, self.vad)
+            if not vad_result["has_speech"]:
+                return {"has_speech": False, "path": audio_path, "temp_files": temp_files}
+            if vad_result["path"] != audio_path:
+                temp_files.append(vad_result["path"])
+                upload_path = vad_result["path"]
+
+        if self.stt_codec:
+            encoded_path = f"{audio_path}_stt.{self.stt_codec}"
+            if encode_audio(upload_path, encoded_path, self.stt_codec, self.stt_bitrate):
+                temp_files.append(encoded_path)
+                upload_path = encoded_path
+
+        return {"has_speech": True, "path": upload_path, "temp_files": temp_files}
+
+    @timed("stt")
     def speechtotext(self, audio_path: str) -> str:
         """
         Convert the audio file to text using OpenAI's Whisper API.
+        The audio is preprocessed locally first; if no speech is detected the Whisper call
+        is skipped and an empty transcript is returned.
         """
+        prepared = {"has_speech": True, "path": audio_path, "temp_files": []}
         try:
-            with open(audio_path, "rb") as audio_file:
+            prepared = self.prepare_audio_for_stt(audio_path)
+            if not prepared["has_speech"]:
+                return ""
+            with open(prepared["path"], "rb") as audio_file:
                 transcript_response = self.openai_client.audio.translations.create(
                     model="whisper-1",
                     file=audio_file
@@ -68,11 +120,21 @@ class AudioProcessing:
         except Exception as e:
             logger.error(f"Error in speech-to-text conversion: {e}")
             return ""
+        finally:
+            for temp_file in prepared["temp_files"]:
+                try:
+                    if os.path.exists(temp_file):
+                        os.remove(temp_file)
+                except Exception as e:
+                    logger.warning(f"Could not remove temporary file: {e}")
 
-    def intent_recognition(self, processed_text: str) -> dict:
+    @timed("intent")
+    def intent_recognition(self, processed_text: str, scene_context: str = None) -> dict:
 
         """
         Identify the user's intent using OpenAI's model.
+        'scene_context' holds the scene-memory snippets relevant to the transcript; they are
+        retrieved here when not passed in.
         Returns a JSON object with boolean flags for intents.
         """
         # Default system prompt (used if no video summary is available)
@@ -94,28 +156,35 @@ class AudioProcessing:
             These questions usually refer to real-world visual context such as nearby locations, people, objects, or navigation.  
             Example: "Are there any places to eat nearby?", "Who is standing near the bus stop?", "What's in front of me?"
 
-            You must classify the input into **only one** of the above intents. Set that intent's value to `true`, and set all others to `false`.  
+            5. "Live" – The user wants to start or stop live mode, where their surroundings are described continuously while they move.  
+            Example: "Keep describing what's around me", "Start live mode", "Stop live mode."
+            For this intent, set its value to `"start"` or `"stop"` (what the user asked for) instead of `true`.
+
+            You must classify the input into **only one** of the above intents. Set that intent's value to `true` (`"start"` or `"stop"` for "Live"), and set all others to `false`.  
             Return your output in the following JSON format:
 
             {
                 "Record": false,
                 "General": false,
                 "Fallback": false,
-                "Tavi": true
+                "Tavi": true,
+                "Live": false
             }
 
             Strictly return only the JSON object—no explanation, preamble, or extra text.
             """
 
         
-        # Check for a global video summary
-        if GLOBAL_TEXT_SUMMARY.get("latest", "").strip():
-            video_summary = GLOBAL_TEXT_SUMMARY["latest"]
+        # Check for recorded scene context relevant to the transcript
+        if scene_context is None:
+            scene_context = self.scene_memory.context_for(processed_text)
+        if scene_context.strip():
             custom_system_prompt = f"""
-            You are an AI designed to identify the user's intent from audio transcript and by using context from a previously generated video summary.
-            Here is the video summary: {video_summary}
+            You are an AI designed to identify the user's intent from audio transcript and by using context from the user's previously recorded videos.
+            Here are the observations from the recorded videos most relevant to the transcript:
+            {scene_context}
 
-            Based on the transcribed text and video summary provided to you, classify the transcribed text into exactly one of the following intents:
+            Based on the transcribed text and video observations provided to you, classify the transcribed text into exactly one of the following intents:
 
             1. "Record" – The user is asking to record a video.
             Example: "Start recording", "Can you record a video for me?", "Begin capturing now."
@@ -125,16 +194,20 @@ class AudioProcessing:
             Example: "Can you book a flight to Australia?", "Transfer money to my account."
             4. "Tavi" – The user is asking for a query about the video they have recorded of their surroundings.
             Example: "Are there any places to eat nearby?", "Who is standing near the bus stop?", "What's in front of me?"
+            5. "Live" – The user wants to start or stop live mode, where their surroundings are described continuously while they move.
+            Example: "Keep describing what's around me", "Start live mode", "Stop live mode."
+            For this intent, set its value to "start" or "stop" (what the user asked for) instead of true.
 
-            Use the video summary context to help determine if the user's query is about their surroundings.
-            You must classify the input into only one of the above intents. Set that intent's value to true, and set all others to false.
+            Use the video observations to help determine if the user's query is about their surroundings.
+            You must classify the input into only one of the above intents. Set that intent's value to true ("start" or "stop" for "Live"), and set all others to false.
             Return your output as a JSON object in the following format:
 
             {{
                 "Record": false,
                 "General": false,
                 "Fallback": false,
-                "Tavi": true
+                "Tavi": true,
+                "Live": false
             }}
             Strictly return only the JSON object—no explanation, preamble, or extra text. 
             """
@@ -153,12 +226,16 @@ class AudioProcessing:
             )
             # Access the content of the returned message using dot notation
             intent_json = json.loads(response.choices[0].message.content)
+            # "Live" carries the requested action; anything other than "stop" starts live mode.
+            if intent_json.get("Live"):
+                intent_json["Live"] = "stop" if str(intent_json["Live"]).strip().lower() == "stop" else "start"
             return intent_json
         except Exception as e:
             logger.error(f"Error during intent recognition: {e}")
             return {}
 
 
+    @timed("tts")
     def text_to_speech(self, text: str, output_path: str) -> bool:
         """
         Convert the provided text to speech using pyttsx3 and save as an audio file.
@@ -177,64 +254,91 @@ class AudioProcessing:
             logger.error(f"Error generating TTS audio: {e}")
             return False
 
-    def process_audio(self, audio_file_path: str) -> dict:
+    def process_audio(self, audio_file_path: str, use_cache: bool = True) -> dict:
         """
         Main processing function for audio:
-            1. Convert audio file to text using Whisper (STT).
-            2. Use intent recognition to classify the transcript.
+            1. Convert audio file to text using Whisper (STT). Silence is trimmed locally first
+               and the Whisper call is skipped when no speech is found.
+            2. Use intent recognition to classify the transcript (skipped for an empty transcript).
             3. Based on the intent, generate response text (data2):
-                a. Record intent: return empty response.
-                b. General intent: send transcript to ChatGroq LLM for a brief answer.
+                a. Record or Live intent: return empty response (the client records a clip, or starts/stops live mode as data1["Live"] says).
+                b. General intent: send transcript to ChatGroq LLM for a brief answer, unless the
+                   same (normalized) question was answered recently; 'use_cache=False' bypasses the cache.
                 c. Fallback intent: return a fixed fallback message.
-                d. Tavi intent: if a global text summary exists, combine it with transcript to query ChatGroq; else, return a fallback message.
+                d. Tavi intent: if scene memory has recordings, combine the top-k snippets relevant to the
+                   transcript with it to query ChatGroq; else, return a fallback message.
             4. Convert response text to audio (TTS) to generate data3.
             5. Return a dictionary with data1 (intent), data2 (text response), and data3 (audio file path).
         """
         # Step 1: Speech-to-Text conversion
         audio_transcript = self.speechtotext(audio_file_path)
 
-        # Step 2: Intent Recognition
-        data1 = self.intent_recognition(audio_transcript)
-
         # Initialize data2 as empty text and define path for TTS audio output.
         data2 = ""
         temp_dir = "temp_uploads"
         os.makedirs(temp_dir, exist_ok=True)
         audio_output_path = os.path.join(temp_dir, f"{os.path.basename(audio_file_path)}_response.mp3")
 
+        # Step 2: Intent Recognition (skipped when no speech was transcribed)
+        # The relevant scene snippets are retrieved once and shared by the intent and Tavi prompts.
+        scene_context = self.scene_memory.context_for(audio_transcript) if audio_transcript.strip() else ""
+        data1 = self.intent_recognition(audio_transcript, scene_context) if audio_transcript.strip() else {}
+
         # Step 3: Branch based on recognized intent.
         try:
-            # (a) Record intent: return empty response text and an empty audio file.
-            if data1.get("Record"):
+            # No speech: ask the user to repeat without calling any LLM.
+            if not audio_transcript.strip():
+                data2 = "Sorry, I didn't catch that. Could you say it again?"
+                self.text_to_speech(data2, audio_output_path)
+            # (a) Record or Live intent: the client starts the camera; return empty response text and an empty audio file.
+            elif data1.get("Record") or data1.get("Live"):
                 data2 = ""
                 with open(audio_output_path, "wb") as f:
                     f.write(b"")
             # (b) General intent: Use transcript to query ChatGroq for a brief answer.
             elif data1.get("General"):
-                messages = [
-                    ("system", "Provide a concise answer between 30 and 40 words for the following query:"),
-                    ("human", audio_transcript)
-                ]
-                response = self.llm.invoke(messages)
-                data2 = response.content.strip()
-                self.text_to_speech(data2, audio_output_path)
+                cached = None
+                if not use_cache or not self.response_cache.enabled:
+                    self.response_cache.record_bypass()
+                else:
+                    cached = self.response_cache.get(audio_transcript)
+
+                if cached is not None:
+                    # Cache hit: reuse the answer and its audio, skipping both Groq and TTS.
+                    data2 = cached.text
+                    with open(audio_output_path, "wb") as f:
+                        f.write(cached.audio)
+                else:
+                    messages = [
+                        ("system", "Provide a concise answer between 30 and 40 words for the following query:"),
+                        ("human", audio_transcript)
+                    ]
+                    with stage("llm_answer"):
+                        response = self.llm.invoke(messages)
+                    data2 = response.content.strip()
+                    if self.text_to_speech(data2, audio_output_path) and use_cache and os.path.exists(audio_output_path):
+                        with open(audio_output_path, "rb") as f:
+                            audio = f.read()
+                        if audio:
+                            self.response_cache.put(audio_transcript, data2, audio)
             # (c) Fallback intent: Return fallback message.
             elif data1.get("Fallback"):
                 data2 = "I am sorry, I cannot help you with this request. Could you try asking again?"
                 self.text_to_speech(data2, audio_output_path)
             # (d) Tavi intent: Query about the video surroundings.
             elif data1.get("Tavi"):
-                if GLOBAL_TEXT_SUMMARY.get("latest", "").strip():
+                if scene_context.strip():
                     messages = [
                         (
                             "system",
-                            "You are an AI assistant helping a user understand their surroundings from a video. Based on the provided summary of the user's environment, answer the user's query with a brief and clear response **only if the information is available in the video summary**. "
-                            "If the summary does not contain the relevant information, respond with: \"I'm sorry, I couldn't find what you're looking for in the recorded video.\" "
+                            "You are an AI assistant helping a user understand their surroundings from their recorded videos. Based on the provided observations of the user's environment (each marked with when it was recorded), answer the user's query with a brief and clear response **only if the information is available in the observations**. "
+                            "If the observations do not contain the relevant information, respond with: \"I'm sorry, I couldn't find what you're looking for in the recorded video.\" "
                             "Your response must be a single sentence, with no preamble or additional explanation."
                         ),
-                        ("human", f"Video Summary of user surroundings: {GLOBAL_TEXT_SUMMARY['latest']} User Query about surroundings: {audio_transcript}")
+                        ("human", f"Observations of user surroundings:\n{scene_context}\nUser Query about surroundings: {audio_transcript}")
                     ]
-                    response = self.llm.invoke(messages)
+                    with stage("llm_answer"):
+                        response = self.llm.invoke(messages)
                     data2 = response.content.strip()
                     self.text_to_speech(data2, audio_output_path)
                 else:
@@ -0,0 +1,10 @@
+"""
+Offline benchmark suite for the TAVI backend.
+
+Every remote provider (Mistral OCR, Groq, OpenAI Whisper / intent model, Hugging Face BLIP weights,
+pyttsx3) is replaced by an in-process fake with configurable latency and payloads, so the pipeline
+can be timed without API keys. Run from the backend directory:
+
+    python -m benchmarks.run --iterations 5 --output bench.json
+    python -m benchmarks.run --compare bench.json
+"""
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import wave
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+# Default injected latency per provider call, in seconds (roughly what the real services take).
+DEFAULT_LATENCY = {
+    "blip": 0.15,     # local BLIP generate() per frame
+    "ocr": 0.40,      # Mistral OCR per frame
+    "llm": 0.60,      # Groq chat completion
+    "stt": 0.50,      # Whisper transcription
+    "intent": 0.30,   # OpenAI intent classification
+    "tts": 0.20,      # pyttsx3 synthesis
+}
+
+# Default payloads returned by the fakes.
+DEFAULT_PAYLOADS = {
+    "caption": "a person standing in a hallway next to a door",
+    "ocr": "EXIT  Room 204  Push to open",
+    "llm": "You are standing in a quiet hallway with a door to your right marked Exit and room 204 ahead.",
+    "transcript": "What is in front of me right now?",
+    "intent": {"Record": False, "General": False, "Fallback": False, "Tavi": True},
+}
+
+
+class ProviderLatency:
+    def __init__(self, latency: dict = None, scale: float = 1.0):
+        self.latency = dict(DEFAULT_LATENCY, **(latency or {}))
+        self.scale = scale
+
+    def wait(self, provider: str):
+        delay = self.latency.get(provider, 0.0) * self.scale
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _FakeInputs(dict):
+    def to(self, device):
+        return self
+
+
+class FakeBlipProcessor:
+    def __init__(self, latency: ProviderLatency, payloads: dict):
+        self.latency = latency
+        self.payloads = payloads
+
+    def __call__(self, images=None, text=None, return_tensors=None, **kwargs):
+        batch = len(images) if isinstance(images, (list, tuple)) else 1
+        return _FakeInputs(pixel_values=[[0.0]] * batch)
+
+    def decode(self, tokens, skip_special_tokens=True):
+        return self.payloads["caption"]
+
+    def batch_decode(self, sequences, skip_special_tokens=True):
+        return [self.payloads["caption"] for _ in sequences]
+
+
+class FakeBlipModel:
+    def __init__(self, latency: ProviderLatency):
+        self.latency = latency
+
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+    def generate(self, pixel_values=None, **kwargs):
+        self.latency.wait("blip")
+        return [[0]] * (len(pixel_values) if pixel_values is not None else 1)
+
+
+class FakeMistral:
+    def __init__(self, latency: ProviderLatency, payloads: dict):
+        def process(model=None, document=None, **kwargs):
+            latency.wait("ocr")
+            return payloads["ocr"]
+
+        self.ocr = SimpleNamespace(process=process)
+
+
+class FakeChatGroq:
+    def __init__(self, latency: ProviderLatency, payloads: dict):
+        self.latency = latency
+        self.payloads = payloads
+
+    def invoke(self, messages):
+        self.latency.wait("llm")
+        return SimpleNamespace(content=self.payloads["llm"])
+
+
+class FakeOpenAI:
+    def __init__(self, latency: ProviderLatency, payloads: dict):
+        def transcribe(model=None, file=None, **kwargs):
+            latency.wait("stt")
+            if file is not None:
+                file.read()
+            return SimpleNamespace(text=payloads["transcript"])
+
+        def complete(model=None, messages=None, **kwargs):
+            latency.wait("intent")
+            message = SimpleNamespace(content=json.dumps(payloads["intent"]))
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        self.audio = SimpleNamespace(
+            translations=SimpleNamespace(create=transcribe),
+            transcriptions=SimpleNamespace(create=transcribe),
+        )
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=complete))
+
+
+class FakeTTSEngine:
+    """
+    Mimics pyttsx3: save_to_file() queues text, runAndWait() writes a silent WAV whose length
+    follows the text length (about 15 characters per second, like real speech).
+    """
+
+    def __init__(self, latency: ProviderLatency):
+        self.latency = latency
+        self._queue = []
+
+    def save_to_file(self, text, path):
+        self._queue.append((text, path))
+
+    def runAndWait(self):
+        queue, self._queue = self._queue, []
+        for text, path in queue:
+            self.latency.wait("tts")
+            seconds = max(0.5, len(text) / 15.0)
+            with wave.open(path, "wb") as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(22050)
+                wf.writeframes(b"\x00\x00" * int(22050 * seconds))
+
+    def setProperty(self, name, value):
+        pass
+
+
+@contextmanager
+def fake_providers(latency: dict = None, scale: float = 1.0, payloads: dict = None):
+    """
+    Patch every remote provider used by processing.py and audio_processing.py with in-process fakes
+    and provide dummy API keys. Processors constructed inside the context (including the ones
+    created when app.py is imported) use the fakes.
+    """
+    import processing
+    import audio_processing
+
+    provider_latency = ProviderLatency(latency, scale)
+    provider_payloads = dict(DEFAULT_PAYLOADS, **(payloads or {}))
+    fake_pyttsx3 = SimpleNamespace(init=lambda *args, **kwargs: FakeTTSEngine(provider_latency))
+    blip_processor = SimpleNamespace(from_pretrained=lambda *a, **k: FakeBlipProcessor(provider_latency, provider_payloads))
+    blip_model = SimpleNamespace(from_pretrained=lambda *a, **k: FakeBlipModel(provider_latency))
+
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.dict(os.environ, {
+            "MISTRAL_API_KEY": "benchmark",
+            "GROQ_API_KEY": "benchmark",
+            "OPENAI_API_KEY": "benchmark",
+            "HF_API_KEY": "benchmark",
+        }))
+        stack.enter_context(mock.patch.object(processing, "BlipProcessor", blip_processor))
+        stack.enter_context(mock.patch.object(processing, "BlipForConditionalGeneration", blip_model))
+        stack.enter_context(mock.patch.object(processing, "Mistral", lambda *a, **k: FakeMistral(provider_latency, provider_payloads)))
+        stack.enter_context(mock.patch.object(processing, "ChatGroq", lambda *a, **k: FakeChatGroq(provider_latency, provider_payloads)))
+        stack.enter_context(mock.patch.object(processing, "pyttsx3", fake_pyttsx3))
+        stack.enter_context(mock.patch.object(audio_processing, "OpenAI", lambda *a, **k: FakeOpenAI(provider_latency, provider_payloads)))
+        stack.enter_context(mock.patch.object(audio_processing, "ChatGroq", lambda *a, **k: FakeChatGroq(provider_latency, provider_payloads)))
+        stack.enter_context(mock.patch.object(audio_processing, "pyttsx3", fake_pyttsx3))
+        yield provider_latency
@@ -0,0 +1,195 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+import cv2
+from PIL import Image
+
+# Make the backend modules importable however the suite is started.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.fakes import DEFAULT_LATENCY, fake_providers
+from benchmarks.synthetic import make_video, make_keyframes, make_wav
+
+
+def summarize(durations: list) -> dict:
+    """
+    Summary statistics (seconds) for a list of durations.
+    """
+    ordered = sorted(durations)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "iterations": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": statistics.median(ordered),
+        "p95": ordered[p95_index],
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+
+
+def time_call(fn, iterations: int, warmup: int = 1) -> dict:
+    for _ in range(warmup):
+        fn()
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return summarize(durations)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def run_stage_benchmarks(workdir: str, iterations: int) -> dict:
+    """
+    Time each pipeline stage separately against the fake providers.
+    """
+    from processing import SurroundingAwarenessProcessor
+    from audio_processing import AudioProcessing
+
+    processor = SurroundingAwarenessProcessor()
+    audio_processor = AudioProcessing()
+
+    video_path = make_video(os.path.join(workdir, "bench_video.mp4"))
+    speech_wav = make_wav(os.path.join(workdir, "bench_speech.wav"))
+    silent_wav = make_wav(os.path.join(workdir, "bench_silence.wav"), speech_seconds=0)
+
+    frames = processor.extract_frames(video_path)
+    frame = frames[0]
+    image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    combined_text = processor.process_frames(frames[:2])["combined_text"]
+    summary = processor.generate_llm_summary(combined_text)
+    tts_path = os.path.join(workdir, "bench_tts.mp3")
+
+    return {
+        "extract_frames": time_call(lambda: processor.extract_frames(video_path), iterations),
+        "get_caption": time_call(lambda: processor.get_caption(image), iterations),
+        "get_ocr_text": time_call(lambda: processor.get_ocr_text(frame), iterations),
+        "generate_llm_summary": time_call(lambda: processor.generate_llm_summary(combined_text), iterations),
+        "generate_audio": time_call(lambda: processor.generate_audio(summary, tts_path), iterations),
+        "speechtotext": time_call(lambda: audio_processor.speechtotext(speech_wav), iterations),
+        "speechtotext_silence": time_call(lambda: audio_processor.speechtotext(silent_wav), iterations),
+        "intent_recognition": time_call(lambda: audio_processor.intent_recognition("What is in front of me?"), iterations),
+    }
+
+
+def run_end_to_end_benchmarks(workdir: str, iterations: int) -> dict:
+    """
+    Time full requests through the FastAPI app (processors are built with the fake providers).
+    """
+    from fastapi.testclient import TestClient
+    import app as api
+
+    video_path = os.path.join(workdir, "bench_video.mp4")
+    speech_wav = os.path.join(workdir, "bench_speech.wav")
+    keyframes = make_keyframes(video_path)
+
+    with open(video_path, "rb") as f:
+        video_bytes = f.read()
+    with open(speech_wav, "rb") as f:
+        audio_bytes = f.read()
+
+    def post(path, **kwargs):
+        response = client.post(path, **kwargs)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}: {response.text}")
+
+    with TestClient(api.app) as client:
+        return {
+            "process_video": time_call(
+                lambda: post("/process_video/", files={"file": ("bench.mp4", video_bytes, "video/mp4")}), iterations
+            ),
+            "process_frames": time_call(
+                lambda: post("/process_frames/", files=[("files", (f"frame_{i}.jpg", jpeg, "image/jpeg")) for i, jpeg in enumerate(keyframes)]),
+                iterations,
+            ),
+            "process_audio": time_call(
+                lambda: post("/process_audio/", files={"file": ("bench.wav", audio_bytes, "audio/wav")}), iterations
+            ),
+        }
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """
+    Relative change of the mean duration per stage against a baseline run (negative is faster).
+    """
+    changes = {}
+    for section in ("stages", "end_to_end"):
+        for name, stats in current.get(section, {}).items():
+            before = baseline.get(section, {}).get(name)
+            if before and before.get("mean"):
+                changes[f"{section}.{name}"] = {
+                    "baseline_mean": before["mean"],
+                    "mean": stats["mean"],
+                    "change": (stats["mean"] - before["mean"]) / before["mean"],
+                }
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline per-stage and end-to-end benchmarks for the TAVI backend.")
+    parser.add_argument("--iterations", type=int, default=5, help="Timed iterations per benchmark.")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier for the injected provider latency (0 = no latency).")
+    parser.add_argument("--latency", type=str, default="{}", help='JSON overrides for per-provider latency, e.g. \'{"ocr": 0.8}\'.')
+    parser.add_argument("--skip-end-to-end", action="store_true", help="Only time the individual stages.")
+    parser.add_argument("--output", type=str, default="", help="Write results to this JSON file.")
+    parser.add_argument("--compare", type=str, default="", help="Baseline JSON file to compare against.")
+    args = parser.parse_args(argv)
+
+    latency = dict(DEFAULT_LATENCY, **json.loads(args.latency))
+    output_path = os.path.abspath(args.output) if args.output else ""
+    baseline_path = os.path.abspath(args.compare) if args.compare else ""
+    original_cwd = os.getcwd()
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "latency_scale": args.latency_scale,
+            "latency": latency,
+        },
+    }
+
+    with tempfile.TemporaryDirectory(prefix="tavi-bench-") as workdir:
+        # The API and processors write into ./temp_uploads; keep that out of the source tree.
+        os.chdir(workdir)
+        try:
+            with fake_providers(latency, args.latency_scale):
+                results["stages"] = run_stage_benchmarks(workdir, args.iterations)
+                if not args.skip_end_to_end:
+                    results["end_to_end"] = run_end_to_end_benchmarks(workdir, args.iterations)
+        finally:
+            os.chdir(original_cwd)
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            results["comparison"] = compare(results, json.load(f))
+
+    report = json.dumps(results, indent=2)
+    if output_path:
+        with open(output_path, "w") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
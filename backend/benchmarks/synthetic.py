@@ -0,0 +1,67 @@
+import wave
+
+import cv2
+import numpy as np
+
+
+def make_video(path: str, seconds: float = 5.0, fps: float = 20.0, width: int = 640, height: int = 480) -> str:
+    """
+    Write a synthetic mp4v video (same container/codec as the Kivy client records) with a moving
+    shape and some text, so that frames differ and OCR-like content is present.
+    """
+    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+    out = cv2.VideoWriter(path, fourcc, fps, (width, height))
+    total = int(seconds * fps)
+    for i in range(total):
+        frame = np.full((height, width, 3), 40 + (i * 3) % 120, dtype=np.uint8)
+        x = int((width - 100) * i / max(1, total - 1))
+        cv2.rectangle(frame, (x, height // 3), (x + 100, height // 3 + 100), (0, 200, 255), -1)
+        cv2.putText(frame, f"EXIT {i:03d}", (20, height - 40), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+        out.write(frame)
+    out.release()
+    return path
+
+
+def make_keyframes(video_path: str, count: int = 8, max_width: int = 640) -> list:
+    """
+    Return 'count' evenly spaced JPEG-encoded frames from a video, as the client uploads them
+    to /process_frames/.
+    """
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frames = []
+    for index in np.linspace(0, max(0, total - 1), num=count).astype(int):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+        ret, frame = cap.read()
+        if not ret:
+            continue
+        height, width = frame.shape[:2]
+        if width > max_width:
+            frame = cv2.resize(frame, (max_width, int(height * max_width / width)))
+        ok, buffer = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), 80])
+        if ok:
+            frames.append(buffer.tobytes())
+    cap.release()
+    return frames
+
+
+def make_wav(path: str, seconds: float = 5.0, speech_start: float = 1.0, speech_seconds: float = 1.5, sample_rate: int = 16000) -> str:
+    """
+    Write a 16 kHz mono WAV like the client records: low background noise with a voiced,
+    speech-like segment (harmonics modulated at syllable rate) in the middle.
+    Pass speech_seconds=0 for a recording with no speech at all.
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    signal = rng.normal(0, 60, size=t.shape)  # ~ -55 dBFS background noise
+    voiced = (t >= speech_start) & (t < speech_start + speech_seconds)
+    tone = sum(np.sin(2 * np.pi * f * t) / (k + 1) for k, f in enumerate((140, 280, 420, 560)))
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)  # ~4 syllables per second
+    signal[voiced] += 6000 * tone[voiced] * envelope[voiced]
+    samples = np.clip(signal, -32768, 32767).astype(np.int16)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.tobytes())
+    return path
@@ -0,0 +1,108 @@
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+
+import torch
+
+from metrics import CAPTION_BATCH_SIZE, stage
+from profiling import current_session
+
+# Set up logging (only errors and warnings are shown)
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Frames captioned per forward pass, and how long the first frame of a batch may wait for company.
+CAPTION_MAX_BATCH_SIZE = int(os.getenv("CAPTION_MAX_BATCH_SIZE", "8"))
+CAPTION_MAX_WAIT_MS = float(os.getenv("CAPTION_MAX_WAIT_MS", "10"))
+# Local caption engine: "torch" (PyTorch BLIP) or "onnx" (ONNX Runtime, see onnx_caption.py).
+CAPTION_ENGINE = os.getenv("CAPTION_ENGINE", "torch").lower()
+
+
+class TorchCaptionEngine:
+    def __init__(self, blip_processor, blip_model, device):
+        """
+        BLIP captioning with the PyTorch model (CAPTION_ENGINE=torch).
+        """
+        self.blip_processor = blip_processor
+        self.blip_model = blip_model
+        self.device = device
+
+    def caption_batch(self, images: list) -> list:
+        with torch.no_grad():
+            inputs = self.blip_processor(images=images, return_tensors="pt").to(self.device)
+            output = self.blip_model.generate(**inputs)
+        return self.blip_processor.batch_decode(output, skip_special_tokens=True)
+
+
+class CaptionBatcher:
+    def __init__(self, engine, max_batch_size: int = CAPTION_MAX_BATCH_SIZE, max_wait_ms: float = CAPTION_MAX_WAIT_MS):
+        """
+        Dynamic micro-batching in front of a local caption engine (TorchCaptionEngine or
+        onnx_caption.OnnxCaptionEngine).
+        Frames submitted by any thread (and so by any concurrent request) are queued; a single
+        worker thread collects up to 'max_batch_size' of them, waiting at most 'max_wait_ms' after
+        the first one arrives, captions them in one engine call and resolves each caller's Future.
+        While a batch is captioned, the worker thread is sampled by the profiling sessions of the
+        requests whose frames are in it.
+        """
+        self.engine = engine
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="caption-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, image) -> Future:
+        """
+        Queue a PIL image for captioning. The Future resolves to the caption string.
+        """
+        future = Future()
+        self._queue.put((image, future, current_session()))
+        return future
+
+    def caption(self, image) -> str:
+        return self.submit(image).result()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Skip frames whose caller has already given up on them.
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            CAPTION_BATCH_SIZE.observe(len(batch))
+            sessions = {session for _, _, session in batch if session is not None}
+            ident = threading.get_ident()
+            for session in sessions:
+                session.add_thread(ident)
+            try:
+                captions = self._caption_batch([image for image, _, _ in batch])
+            except Exception as e:
+                logger.error(f"Error in batched BLIP caption generation: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finally:
+                for session in sessions:
+                    session.remove_thread(ident)
+            for (_, future, _), caption in zip(batch, captions):
+                future.set_result(caption)
+
+    def _caption_batch(self, images: list) -> list:
+        with stage("caption_batch"):
+            return self.engine.caption_batch(images)
@@ -0,0 +1,122 @@
+import os
+import math
+import logging
+
+import cv2
+
+# Set up logging (only errors and warnings are shown)
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# At most FRAME_BUDGET frames are captioned/OCR'd per video, and no more than one per
+# FRAME_MIN_INTERVAL_SECONDS of footage, whatever the clip's length or frame rate.
+FRAME_BUDGET = int(os.getenv("FRAME_BUDGET", "8"))
+FRAME_MIN_INTERVAL_SECONDS = float(os.getenv("FRAME_MIN_INTERVAL_SECONDS", "1.0"))
+
+
+def spread_indices(total: int, count: int) -> list:
+    """
+    'count' indices spread evenly over range(total), always including the first and the last.
+    """
+    if total <= 0 or count <= 0:
+        return []
+    count = min(count, total)
+    if count == 1:
+        return [0]
+    return sorted({round(i * (total - 1) / (count - 1)) for i in range(count)})
+
+
+def select_evenly(items: list, max_items: int) -> list:
+    """
+    Thin a list to at most 'max_items' entries spread evenly over it, keeping the first and last.
+    """
+    if len(items) <= max_items:
+        return list(items)
+    return [items[i] for i in spread_indices(len(items), max_items)]
+
+
+class FrameSampler:
+    def __init__(self, max_frames: int = FRAME_BUDGET, min_interval_seconds: float = FRAME_MIN_INTERVAL_SECONDS):
+        """
+        Duration- and FPS-aware frame selection.
+        The number of frames is derived from the clip's duration (one per 'min_interval_seconds')
+        and capped at 'max_frames'; the frames are spread evenly over time and always include the
+        first and last frame. Frames that are not selected are only grabbed, never retrieved.
+        """
+        self.max_frames = max(1, max_frames)
+        self.min_interval_seconds = max(0.0, min_interval_seconds)
+
+    def plan(self, total_frames: int, fps: float) -> list:
+        """
+        Frame indices to keep for a clip with 'total_frames' frames at 'fps'.
+        """
+        duration = total_frames / fps
+        by_duration = int(duration / self.min_interval_seconds) + 1 if self.min_interval_seconds > 0 else total_frames
+        return spread_indices(total_frames, min(self.max_frames, max(2, by_duration)))
+
+    def sample(self, cap) -> tuple:
+        """
+        Read the selected frames from an opened cv2.VideoCapture.
+        Returns (frames, frames_read).
+        """
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        if total_frames <= 0 or not math.isfinite(fps) or fps <= 0:
+            # Some containers (e.g. streamed WebM) do not report a frame count or rate.
+            return self._sample_unknown_length(cap)
+
+        indices = self.plan(total_frames, fps)
+        targets = set(indices)
+        last_target = indices[-1]
+        # The reported frame count can overstate the real one; keep the most recent frame near the
+        # end so that a clip that stops early still contributes its last frame.
+        tail_start = max(0, last_target - int(math.ceil(fps)))
+        frames = []
+        last_kept_index = -1
+        tail = None
+        index = 0
+        while index <= last_target:
+            if not cap.grab():
+                break
+            if index in targets or index >= tail_start:
+                ret, frame = cap.retrieve()
+                if ret and index in targets:
+                    frames.append(frame)
+                    last_kept_index = index
+                elif ret:
+                    tail = (index, frame)
+            index += 1
+        if index <= last_target and tail is not None and tail[0] > last_kept_index:
+            frames.append(tail[1])
+        return frames, index
+
+    def _sample_unknown_length(self, cap) -> tuple:
+        """
+        Single pass for clips of unknown length: keep one frame per interval and, when the budget
+        is exceeded, drop every other kept frame and double the interval. The final frame is
+        always added at the end.
+        """
+        interval = self.min_interval_seconds
+        kept = []  # (timestamp_seconds, frame)
+        next_time = 0.0
+        last = None
+        index = 0
+        while cap.grab():
+            timestamp = (cap.get(cv2.CAP_PROP_POS_MSEC) or 0.0) / 1000.0
+            if timestamp <= 0 and index > 0:
+                timestamp = index / 30.0  # No timestamps either; assume a typical frame rate
+            ret, frame = cap.retrieve()
+            index += 1
+            if not ret:
+                continue
+            last = (timestamp, frame)
+            if timestamp >= next_time:
+                kept.append(last)
+                # One slot stays free for the final frame.
+                while len(kept) > max(1, self.max_frames - 1):
+                    kept = kept[::2]
+                    interval = interval * 2 if interval > 0 else 1.0 / 30.0
+                next_time = kept[-1][0] + interval
+        if last is not None and (not kept or kept[-1] is not last):
+            kept.append(last)
+        return [frame for _, frame in kept[:self.max_frames]], index
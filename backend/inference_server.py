@@ -0,0 +1,227 @@
+import os
+import sys
+import logging
+import secrets
+import argparse
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Set up logging (only errors and warnings are shown)
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Local IPC endpoint shared by the inference server and the API workers.
+# A Unix socket path on POSIX; "host:port" (loopback only) elsewhere.
+DEFAULT_ADDRESS = "/tmp/tavi_caption.sock" if sys.platform != "win32" else "127.0.0.1:6001"
+CAPTION_SERVER_ADDRESS = os.getenv("CAPTION_SERVER_ADDRESS", DEFAULT_ADDRESS)
+# Connections are authenticated with a shared key, since multiprocessing.connection unpickles every
+# message. Without an explicit CAPTION_SERVER_AUTHKEY the server generates a random key into
+# CAPTION_SERVER_AUTHKEY_FILE (readable by its owner only) and the workers read it from there.
+CAPTION_SERVER_AUTHKEY = os.getenv("CAPTION_SERVER_AUTHKEY", "")
+CAPTION_SERVER_AUTHKEY_FILE = os.getenv(
+    "CAPTION_SERVER_AUTHKEY_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".caption_server_key"),
+)
+
+
+def load_authkey(create: bool = False) -> bytes:
+    """
+    Return the authkey shared by the inference server and the API workers.
+    With create=True (the server), a missing key file is generated with mode 0600.
+    """
+    if CAPTION_SERVER_AUTHKEY:
+        return CAPTION_SERVER_AUTHKEY.encode("utf-8")
+    if create:
+        try:
+            fd = os.open(CAPTION_SERVER_AUTHKEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            os.chmod(CAPTION_SERVER_AUTHKEY_FILE, 0o600)
+        else:
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(32))
+    try:
+        with open(CAPTION_SERVER_AUTHKEY_FILE, "r") as f:
+            key = f.read().strip()
+    except FileNotFoundError:
+        key = ""
+    if not key:
+        raise RuntimeError(
+            f"No caption server authkey: set CAPTION_SERVER_AUTHKEY or start the inference server "
+            f"first so it creates {CAPTION_SERVER_AUTHKEY_FILE}."
+        )
+    return key.encode("utf-8")
+
+
+def parse_address(address: str):
+    """
+    Return (address, family) for multiprocessing.connection.
+    """
+    if ":" in address and not address.startswith("/"):
+        host, port = address.rsplit(":", 1)
+        return (host, int(port)), "AF_INET"
+    return address, "AF_UNIX"
+
+
+class CaptionServer:
+    def __init__(self, address: str = CAPTION_SERVER_ADDRESS, authkey: bytes = None):
+        """
+        Out-of-process BLIP captioning server.
+        A single process owns the model so that any number of uvicorn workers share one resident
+        copy. Workers connect over a local socket and pass frames through shared memory; only the
+        segment name, shape and dtype travel over the socket.
+        Frames from concurrent connections are captioned together by a CaptionBatcher.
+        """
+        import torch
+        from transformers import BlipProcessor, BlipForConditionalGeneration
+        from caption_batcher import CaptionBatcher, TorchCaptionEngine, CAPTION_ENGINE, CAPTION_MAX_BATCH_SIZE
+        from onnx_caption import OnnxCaptionEngine
+
+        self.address, self.family = parse_address(address)
+        self.authkey = authkey if authkey is not None else load_authkey(create=True)
+        self.device = torch.device("cuda") if torch.cuda.is_available() else torch.device("cpu")
+        try:
+            if CAPTION_ENGINE == "onnx":
+                self.engine = OnnxCaptionEngine()
+            else:
+                blip_processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
+                blip_model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base").to(self.device)
+                self.engine = TorchCaptionEngine(blip_processor, blip_model, self.device)
+        except Exception as e:
+            logger.error(f"Failed to load BLIP model: {e}")
+            raise
+        self._model_lock = threading.Lock()
+        self.batcher = None
+        if CAPTION_MAX_BATCH_SIZE > 1:
+            self.batcher = CaptionBatcher(self.engine)
+
+    def caption(self, frame: np.ndarray) -> str:
+        """
+        Caption one RGB frame (H x W x 3, uint8).
+        """
+        from PIL import Image
+
+        image = Image.fromarray(frame)
+        if self.batcher is not None:
+            return self.batcher.caption(image)
+        with self._model_lock:
+            return self.engine.caption_batch([image])[0]
+
+    def handle_request(self, request: tuple) -> tuple:
+        command = request[0]
+        if command == "ping":
+            return ("ok", "pong")
+        if command != "caption":
+            return ("error", f"Unknown command: {command}")
+
+        _, shm_name, shape, dtype = request
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            # The client owns (and unlinks) the segment; stop this process's resource tracker
+            # from claiming it as well.
+            resource_tracker.unregister(shm._name, "shared_memory")
+            frame = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf).copy()
+        finally:
+            shm.close()
+        return ("ok", self.caption(frame))
+
+    def _serve_connection(self, conn):
+        try:
+            while True:
+                try:
+                    request = conn.recv()
+                except EOFError:
+                    break
+                try:
+                    reply = self.handle_request(request)
+                except Exception as e:
+                    logger.error(f"Error in caption server request: {e}")
+                    reply = ("error", str(e))
+                conn.send(reply)
+        finally:
+            conn.close()
+
+    def serve_forever(self):
+        if self.family == "AF_UNIX" and os.path.exists(self.address):
+            os.remove(self.address)  # Stale socket from a previous run
+        with Listener(self.address, family=self.family, authkey=self.authkey) as listener:
+            if self.family == "AF_UNIX":
+                os.chmod(self.address, 0o600)  # Only the owner's processes may connect
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    logger.error(f"Error accepting caption client: {e}")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+
+class CaptionServerClient:
+    def __init__(self, address: str = CAPTION_SERVER_ADDRESS, authkey: bytes = None):
+        """
+        Client used by the API workers. Each thread keeps its own persistent connection,
+        since a multiprocessing Connection must not be shared between threads.
+        Without an explicit authkey, the key is loaded on first connect, so the workers may be
+        started before the server has generated its key file.
+        """
+        self.address, self.family = parse_address(address)
+        self.authkey = authkey
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.authkey is None:
+                self.authkey = load_authkey()
+            conn = Client(self.address, family=self.family, authkey=self.authkey)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, request: tuple):
+        try:
+            conn = self._connection()
+            conn.send(request)
+            status, payload = conn.recv()
+        except (EOFError, OSError):
+            # The server restarted; reconnect once.
+            self._local.conn = None
+            conn = self._connection()
+            conn.send(request)
+            status, payload = conn.recv()
+        if status != "ok":
+            raise RuntimeError(payload)
+        return payload
+
+    def ping(self) -> bool:
+        return self._request(("ping",)) == "pong"
+
+    def caption(self, frame: np.ndarray) -> str:
+        """
+        Caption one RGB frame (H x W x 3, uint8) on the shared server.
+        """
+        frame = np.ascontiguousarray(frame)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, frame.nbytes))
+        try:
+            np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)[...] = frame
+            return self._request(("caption", shm.name, frame.shape, frame.dtype.str))
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared BLIP captioning server for the TAVI API workers.")
+    parser.add_argument("--address", default=CAPTION_SERVER_ADDRESS, help="Unix socket path or host:port to listen on.")
+    args = parser.parse_args(argv)
+    server = CaptionServer(address=args.address)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+
+# Set up logging (only errors and warnings are shown)
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("done", "failed")
+
+
+class JobQueue:
+    def __init__(self, db_path: str = "jobs/jobs.db", max_attempts: int = 3, lease_seconds: float = 60.0):
+        """
+        Persistent local job queue backed by sqlite, safe to share between processes.
+        Jobs move through queued -> running -> done/failed and record the pipeline stage they are in.
+        A claimed job is leased to this queue instance for 'lease_seconds' and the lease is renewed
+        while the job runs; recover() only requeues running jobs whose lease has lapsed (their
+        process died), so jobs of live sibling workers are never taken over.
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._new_job = threading.Event()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT NOT NULL DEFAULT '',
+                    input_path TEXT NOT NULL,
+                    options TEXT NOT NULL DEFAULT '{}',
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)").fetchall()}
+            # Databases created before leases were added get the columns on first use.
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            if "lease_expires_at" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease_expires_at REAL")
+
+    def _connect(self):
+        # One short-lived connection per operation keeps this safe to use from any thread.
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _row_to_job(self, row) -> dict:
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"] or "{}")
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def submit(self, kind: str, input_path: str, options: dict = None) -> str:
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, stage, input_path, options, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', 'queued', ?, ?, ?, ?)",
+                (job_id, kind, input_path, json.dumps(options or {}), now, now),
+            )
+        self._new_job.set()
+        return job_id
+
+    def claim(self):
+        """
+        Atomically take the oldest queued job, mark it running and lease it to this instance.
+        Returns None if the queue is empty.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', stage = 'starting', attempts = attempts + 1, owner = ?, "
+                "lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                (self.owner, now + self.lease_seconds, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return self.get(row["id"])
+
+    def wait_for_job(self, timeout: float):
+        self._new_job.wait(timeout)
+        self._new_job.clear()
+
+    # Updates of a running job only apply while this instance still holds its lease.
+
+    def set_stage(self, job_id: str, stage: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET stage = ?, updated_at = ? WHERE id = ? AND status = 'running' AND owner = ?",
+                (stage, time.time(), job_id, self.owner),
+            )
+
+    def renew(self, job_ids: list):
+        """
+        Extend the lease of running jobs held by this instance.
+        """
+        if not job_ids:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = 'running' AND owner = ?",
+                [(time.time() + self.lease_seconds, job_id, self.owner) for job_id in job_ids],
+            )
+
+    def complete(self, job_id: str, result: dict):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', stage = 'done', result = ?, error = NULL, lease_expires_at = NULL, "
+                "updated_at = ? WHERE id = ? AND status = 'running' AND owner = ?",
+                (json.dumps(result), time.time(), job_id, self.owner),
+            )
+
+    def fail(self, job_id: str, error: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, lease_expires_at = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND owner = ?",
+                (error, time.time(), job_id, self.owner),
+            )
+
+    def get(self, job_id: str):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def counts(self) -> dict:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def recover(self) -> int:
+        """
+        Requeue orphaned jobs: running jobs whose lease lapsed because their process stopped.
+        Orphans that ran out of attempts are failed instead. Returns the number of jobs requeued.
+        """
+        now = time.time()
+        orphaned = "status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?)"
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Exceeded maximum attempts', lease_expires_at = NULL, "
+                f"updated_at = ? WHERE {orphaned} AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', stage = 'queued', owner = NULL, lease_expires_at = NULL, "
+                f"updated_at = ? WHERE {orphaned}",
+                (now, now),
+            )
+            requeued = cursor.rowcount
+        if requeued:
+            self._new_job.set()
+        return requeued
+
+    def purge(self, older_than_seconds: float) -> list:
+        """
+        Delete finished jobs older than the retention period. Returns their input paths.
+        """
+        cutoff = time.time() - older_than_seconds
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT input_path FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,)
+            ).fetchall()
+            conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,))
+        return [row["input_path"] for row in rows]
+
+
+class JobWorkerPool:
+    def __init__(self, queue: JobQueue, handlers: dict, workers: int = 2):
+        """
+        Threads that pull jobs from the queue and run the handler registered for the job kind.
+        A handler is called as handler(job, set_stage) and returns the JSON-serializable result.
+        A heartbeat thread renews the leases of the jobs being run and requeues orphaned jobs of
+        processes that died, so several API processes can share one queue.
+        """
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self._stop = threading.Event()
+        self._threads = []
+        self._active = set()  # ids of the jobs this pool is running
+        self._active_lock = threading.Lock()
+
+    def start(self):
+        self.queue.recover()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+
+    def _heartbeat(self):
+        while not self._stop.wait(max(1.0, self.queue.lease_seconds / 3)):
+            try:
+                with self._active_lock:
+                    active = list(self._active)
+                self.queue.renew(active)
+                self.queue.recover()
+            except Exception as e:
+                logger.error(f"Error renewing job leases: {e}")
+
+    def stop(self):
+        self._stop.set()
+        self.queue._new_job.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim()
+            except Exception as e:
+                logger.error(f"Error claiming job: {e}")
+                job = None
+            if job is None:
+                self.queue.wait_for_job(timeout=1.0)
+                continue
+            with self._active_lock:
+                self._active.add(job["id"])
+            try:
+                self._execute(job)
+            finally:
+                with self._active_lock:
+                    self._active.discard(job["id"])
+
+    def _execute(self, job: dict):
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            self.queue.fail(job["id"], f"Unknown job kind: {job['kind']}")
+            return
+        try:
+            result = handler(job, lambda stage: self.queue.set_stage(job["id"], stage))
+            self.queue.complete(job["id"], result)
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {e}")
+            # Pipeline errors are raised as HTTPException; keep their message rather than the repr.
+            self.queue.fail(job["id"], str(getattr(e, "detail", "") or e))
+        finally:
+            job = self.queue.get(job["id"])
+            if job is not None and job["status"] in FINISHED_STATUSES:
+                try:
+                    if os.path.exists(job["input_path"]):
+                        os.remove(job["input_path"])
+                except Exception as e:
+                    logger.warning(f"Error cleaning up job input: {e}")
@@ -0,0 +1,169 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+import cv2
+
+from metrics import FRAMES
+from scene_memory import ocr_to_text
+
+# Set up logging (only errors and warnings are shown)
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# A streamed frame is only captioned/OCR'd when its dHash differs from every recently processed
+# frame by more than LIVE_SCENE_HASH_DISTANCE bits (out of 64).
+LIVE_SCENE_HASH_DISTANCE = int(os.getenv("LIVE_SCENE_HASH_DISTANCE", "10"))
+LIVE_SCENE_HASH_HISTORY = int(os.getenv("LIVE_SCENE_HASH_HISTORY", "16"))
+# The summary is revised once this much new caption/OCR text has accumulated, and not more often
+# than every LIVE_SCENE_MIN_UPDATE_SECONDS.
+LIVE_SCENE_UPDATE_CHARS = int(os.getenv("LIVE_SCENE_UPDATE_CHARS", "200"))
+LIVE_SCENE_MIN_UPDATE_SECONDS = float(os.getenv("LIVE_SCENE_MIN_UPDATE_SECONDS", "5.0"))
+SEEN_TEXT_HISTORY = 200  # Recent captions/OCR texts remembered to drop repeats
+MEMORY_DETAILS = 100     # Most recent observations a session keeps in its scene-memory recording
+
+
+def dhash(frame, hash_size: int = 8) -> int:
+    """
+    Difference hash of a BGR frame: one bit per horizontally adjacent pixel pair of a
+    (hash_size + 1) x hash_size grayscale thumbnail.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class LiveSceneSession:
+    def __init__(
+        self,
+        processor,
+        scene_memory=None,
+        session_id: str = "live",
+        hash_distance: int = LIVE_SCENE_HASH_DISTANCE,
+        hash_history: int = LIVE_SCENE_HASH_HISTORY,
+        update_chars: int = LIVE_SCENE_UPDATE_CHARS,
+        min_update_seconds: float = LIVE_SCENE_MIN_UPDATE_SECONDS,
+    ):
+        """
+        State of one live-scene stream.
+        Frames whose dHash is close to a recently processed frame are skipped; the others are
+        captioned and OCR'd, and only text not seen recently in this session counts as new.
+        The summary is revised from the previous summary plus the new observations (instead of
+        from scratch) once enough new text has accumulated. The whole session is a single scene
+        memory recording (its latest observations and summary), replaced on every revision, so live
+        mode does not push recorded clips out of the memory.
+        Blocking; call it from the executor.
+        """
+        self.processor = processor
+        self.scene_memory = scene_memory
+        self.session_id = session_id
+        self.hash_distance = hash_distance
+        self.update_chars = max(1, update_chars)
+        self.min_update_seconds = min_update_seconds
+        self.summary = ""
+        self.updates = 0
+        self.frames_received = 0
+        self.frames_processed = 0
+        self._hashes = deque(maxlen=max(1, hash_history))
+        self._seen = deque(maxlen=SEEN_TEXT_HISTORY)
+        self._pending_lines = []
+        self._pending_details = []
+        self._pending_chars = 0
+        self._last_update = 0.0
+        self._memory_details = deque(maxlen=MEMORY_DETAILS)
+        self._lock = threading.Lock()
+
+    def is_changed(self, frame) -> bool:
+        """
+        True (and the frame's hash is remembered) when the frame differs from every recently processed one.
+        """
+        frame_hash = dhash(frame)
+        if any(hamming(frame_hash, seen) <= self.hash_distance for seen in self._hashes):
+            return False
+        self._hashes.append(frame_hash)
+        return True
+
+    def _new_text(self, kind: str, text: str) -> str:
+        text = text.strip()
+        key = (kind, text.lower())
+        if not text or key in self._seen:
+            return ""
+        self._seen.append(key)
+        return text
+
+    def add_frame(self, frame):
+        """
+        Offer one decoded frame. Returns the update (dict with text_summary, change, update)
+        when the summary was revised, else None.
+        """
+        with self._lock:
+            self.frames_received += 1
+            if not self.is_changed(frame):
+                FRAMES.inc(outcome="unchanged")
+                return None
+
+            result = self.processor.process_frames([frame])
+            self.frames_processed += 1
+            for detail in result.get("frame_details", []):
+                caption = self._new_text("caption", str(detail.get("caption") or ""))
+                ocr = self._new_text("ocr", ocr_to_text(detail.get("ocr")))
+                if not caption and not ocr:
+                    continue
+                line = f"Caption: {caption} | OCR: {ocr}"
+                self._pending_lines.append(line)
+                self._pending_details.append(dict(detail, frame_index=self.frames_received - 1))
+                self._pending_chars += len(caption) + len(ocr)
+
+            if not self._pending_lines:
+                return None
+            # The first observations are summarized right away; later ones wait for enough new content.
+            if self.summary and (
+                self._pending_chars < self.update_chars
+                or time.time() - self._last_update < self.min_update_seconds
+            ):
+                return None
+            return self._update()
+
+    def _update(self):
+        summary, change = self.processor.update_llm_summary(self.summary, "\n".join(self._pending_lines))
+        if not summary:
+            return None
+        self.summary = summary
+        self.updates += 1
+        self._last_update = time.time()
+        self._remember(self._pending_details)
+        self._pending_lines, self._pending_details, self._pending_chars = [], [], 0
+        return {"text_summary": summary, "change": change, "update": self.updates}
+
+    def _remember(self, frame_details: list):
+        if self.scene_memory is None or not frame_details:
+            return
+        self._memory_details.extend(frame_details)
+        try:
+            self.scene_memory.add_recording(self.session_id, list(self._memory_details), self.summary)
+        except Exception as e:
+            logger.error(f"Error storing live scene memory: {e}")
+
+    def close(self) -> dict:
+        """
+        End the session: observations not summarized yet are still added to the scene memory.
+        Returns the session's counters.
+        """
+        with self._lock:
+            self._remember(self._pending_details)
+            self._pending_lines, self._pending_details, self._pending_chars = [], [], 0
+            return {
+                "frames_received": self.frames_received,
+                "frames_processed": self.frames_processed,
+                "updates": self.updates,
+            }
@@ -0,0 +1,223 @@
+import time
+import asyncio
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from profiling import track_thread
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Stage timings of the request being handled: a list of (stage, seconds), or None outside a request.
+# The list is shared (not copied) with executor threads, see run_in_executor().
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _format_labels(self.labelnames, key), value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total, observed = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, observed + 1)
+
+    def samples(self):
+        result = []
+        with self._lock:
+            for key, (counts, total, observed) in self._values.items():
+                for bound, count in zip(self.buckets, counts):
+                    result.append((f"{self.name}_bucket", _format_labels(self.labelnames, key, f'le="{bound}"'), count))
+                result.append((f"{self.name}_bucket", _format_labels(self.labelnames, key, 'le="+Inf"'), observed))
+                result.append((f"{self.name}_sum", _format_labels(self.labelnames, key), total))
+                result.append((f"{self.name}_count", _format_labels(self.labelnames, key), observed))
+        return result
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "tavi_stage_duration_seconds", "Duration of individual pipeline stages.", ("stage",)
+))
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "tavi_request_duration_seconds", "Duration of HTTP requests.", ("path", "status")
+))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "tavi_requests_in_flight", "HTTP requests currently being handled."
+))
+FRAMES = REGISTRY.register(Counter(
+    "tavi_frames_total", "Video frames decoded, by outcome (processed, skipped by sampling, or unchanged/dropped in live scenes).", ("outcome",)
+))
+EXECUTOR_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "tavi_executor_queue_depth", "Blocking pipeline calls waiting for an executor thread."
+))
+EXECUTOR_ACTIVE = REGISTRY.register(Gauge(
+    "tavi_executor_active", "Blocking pipeline calls currently running in the executor."
+))
+RESPONSE_CACHE_REQUESTS = REGISTRY.register(Counter(
+    "tavi_response_cache_requests_total", "General-answer cache lookups, by result (hit, miss or bypass).", ("result",)
+))
+RESPONSE_CACHE_ENTRIES = REGISTRY.register(Gauge(
+    "tavi_response_cache_entries", "Answers currently held in the General-answer cache."
+))
+LIVE_SCENE_SESSIONS = REGISTRY.register(Gauge(
+    "tavi_live_scene_sessions", "Live-scene streams currently connected."
+))
+CAPTION_BATCH_SIZE = REGISTRY.register(Histogram(
+    "tavi_caption_batch_size", "Frames captioned per batched BLIP forward pass.", buckets=(1, 2, 4, 8, 16, 32)
+))
+
+
+def record_stage(name: str, seconds: float):
+    STAGE_DURATION.observe(seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a block of code as pipeline stage 'name'.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """
+    Decorator form of stage().
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_request_timings() -> list:
+    """
+    Begin collecting stage timings for the current request and return the collector.
+    """
+    timings = []
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing_header(timings: list, total_seconds: float = None) -> str:
+    """
+    Build a Server-Timing header value, summing repeated stages (e.g. one caption per frame).
+    """
+    totals = {}
+    counts = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+        counts[name] = counts.get(name, 0) + 1
+    entries = [
+        f'{name};dur={seconds * 1000:.1f}' + (f';desc="x{counts[name]}"' if counts[name] > 1 else "")
+        for name, seconds in totals.items()
+    ]
+    if total_seconds is not None:
+        entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+
+async def run_in_executor(func, *args):
+    """
+    Run a blocking call in the default executor, keeping the request's context (so stage timings
+    recorded in the worker thread reach the request) and tracking executor queue depth.
+    If the request is being profiled, the worker thread is sampled while it runs the call.
+    """
+    context = contextvars.copy_context()
+    EXECUTOR_QUEUE_DEPTH.inc()
+
+    def call():
+        EXECUTOR_QUEUE_DEPTH.dec()
+        EXECUTOR_ACTIVE.inc()
+        try:
+            return context.run(track_thread, func, *args)
+        finally:
+            EXECUTOR_ACTIVE.dec()
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, call)
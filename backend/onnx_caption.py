@@ -0,0 +1,343 @@
+import os
+import sys
+import json
+import logging
+import argparse
+import multiprocessing
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Set up logging (only errors and warnings are shown)
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+MODEL_ID = "Salesforce/blip-image-captioning-base"
+
+# Exported graphs live in CAPTION_ONNX_DIR; CAPTION_ONNX_QUANTIZED picks the int8 variants.
+CAPTION_ONNX_DIR = os.getenv("CAPTION_ONNX_DIR", "onnx_blip")
+CAPTION_ONNX_QUANTIZED = os.getenv("CAPTION_ONNX_QUANTIZED", "true").lower() in ("1", "true", "yes")
+CAPTION_ONNX_THREADS = int(os.getenv("CAPTION_ONNX_THREADS", "0"))  # 0 lets ONNX Runtime decide
+
+GRAPHS = ("vision_encoder", "decoder_init", "decoder_with_past")
+META_FILE = "caption_meta.json"
+
+
+def graph_path(model_dir: str, graph: str, quantized: bool) -> str:
+    return os.path.join(model_dir, f"{graph}.int8.onnx" if quantized else f"{graph}.onnx")
+
+
+def export(output_dir: str = CAPTION_ONNX_DIR, quantize: bool = True, opset: int = 14):
+    """
+    Export BLIP to three ONNX graphs in 'output_dir':
+      - vision_encoder:    pixel_values -> image_embeds
+      - decoder_init:      first decoder step, returns logits and the self-attention KV cache
+      - decoder_with_past: one decoder step reusing the KV cache
+    The processor (image preprocessing and tokenizer) is saved alongside, and with 'quantize'
+    each graph also gets a dynamically int8-quantized copy (*.int8.onnx).
+    """
+    import torch
+    from PIL import Image
+    from transformers import BlipProcessor, BlipForConditionalGeneration
+
+    processor = BlipProcessor.from_pretrained(MODEL_ID)
+    model = BlipForConditionalGeneration.from_pretrained(MODEL_ID).eval()
+    text_config = model.config.text_config
+    num_layers = text_config.num_hidden_layers
+    os.makedirs(output_dir, exist_ok=True)
+    processor.save_pretrained(output_dir)
+
+    def self_attention_cache(past_key_values) -> list:
+        # Newer transformers return a Cache object; only the self-attention keys/values are kept,
+        # cross-attention over the image embeddings is recomputed (it is not cached by BLIP).
+        if hasattr(past_key_values, "to_legacy_cache"):
+            past_key_values = past_key_values.to_legacy_cache()
+        return [tensor for layer in past_key_values for tensor in layer[:2]]
+
+    class VisionEncoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.vision_model = model.vision_model
+
+        def forward(self, pixel_values):
+            return self.vision_model(pixel_values=pixel_values, return_dict=True).last_hidden_state
+
+    class DecoderInit(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.text_decoder = model.text_decoder
+
+        def forward(self, input_ids, encoder_hidden_states):
+            out = self.text_decoder(
+                input_ids=input_ids, encoder_hidden_states=encoder_hidden_states, use_cache=True, return_dict=True
+            )
+            return (out.logits[:, -1, :], *self_attention_cache(out.past_key_values))
+
+    class DecoderWithPast(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.text_decoder = model.text_decoder
+
+        def forward(self, input_ids, encoder_hidden_states, *past):
+            past_key_values = tuple((past[2 * i], past[2 * i + 1]) for i in range(num_layers))
+            out = self.text_decoder(
+                input_ids=input_ids,
+                encoder_hidden_states=encoder_hidden_states,
+                past_key_values=past_key_values,
+                use_cache=True,
+                return_dict=True,
+            )
+            return (out.logits[:, -1, :], *self_attention_cache(out.past_key_values))
+
+    past_names = [f"past_{i}_{kv}" for i in range(num_layers) for kv in ("key", "value")]
+    present_names = [f"present_{i}_{kv}" for i in range(num_layers) for kv in ("key", "value")]
+    cache_axes = {0: "batch", 2: "past_sequence"}
+
+    pixel_values = processor(images=Image.new("RGB", (384, 384)), return_tensors="pt")["pixel_values"]
+    vision_encoder = VisionEncoder().eval()
+    decoder_init = DecoderInit().eval()
+    decoder_with_past = DecoderWithPast().eval()
+
+    with torch.no_grad():
+        torch.onnx.export(
+            vision_encoder,
+            (pixel_values,),
+            graph_path(output_dir, "vision_encoder", False),
+            input_names=["pixel_values"],
+            output_names=["image_embeds"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+            opset_version=opset,
+        )
+        image_embeds = vision_encoder(pixel_values)
+
+        input_ids = torch.full((1, 1), text_config.bos_token_id, dtype=torch.long)
+        torch.onnx.export(
+            decoder_init,
+            (input_ids, image_embeds),
+            graph_path(output_dir, "decoder_init", False),
+            input_names=["input_ids", "encoder_hidden_states"],
+            output_names=["logits", *present_names],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "encoder_hidden_states": {0: "batch"},
+                "logits": {0: "batch"},
+                **{name: cache_axes for name in present_names},
+            },
+            opset_version=opset,
+        )
+        init_outputs = decoder_init(input_ids, image_embeds)
+
+        next_ids = init_outputs[0].argmax(dim=-1, keepdim=True)
+        torch.onnx.export(
+            decoder_with_past,
+            (next_ids, image_embeds, *init_outputs[1:]),
+            graph_path(output_dir, "decoder_with_past", False),
+            input_names=["input_ids", "encoder_hidden_states", *past_names],
+            output_names=["logits", *present_names],
+            dynamic_axes={
+                "input_ids": {0: "batch"},
+                "encoder_hidden_states": {0: "batch"},
+                "logits": {0: "batch"},
+                **{name: cache_axes for name in past_names + present_names},
+            },
+            opset_version=opset,
+        )
+
+    meta = {
+        "model_id": MODEL_ID,
+        "bos_token_id": text_config.bos_token_id,
+        "eos_token_id": text_config.sep_token_id,  # BLIP stops generation at [SEP]
+        "pad_token_id": text_config.pad_token_id,
+        "max_length": getattr(model.generation_config, "max_length", None) or 20,
+        "num_layers": num_layers,
+    }
+    with open(os.path.join(output_dir, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        for graph in GRAPHS:
+            quantize_dynamic(
+                graph_path(output_dir, graph, False), graph_path(output_dir, graph, True), weight_type=QuantType.QInt8
+            )
+
+
+class OnnxCaptionEngine:
+    def __init__(self, model_dir: str = CAPTION_ONNX_DIR, quantized: bool = CAPTION_ONNX_QUANTIZED, threads: int = CAPTION_ONNX_THREADS):
+        """
+        BLIP captioning under ONNX Runtime on the CPU (CAPTION_ENGINE=onnx), using the graphs
+        written by export(). Decoding is greedy with a KV cache, matching the PyTorch model's
+        default generate(): start from [DEC], stop at [SEP] or after 'max_length' tokens.
+        """
+        import onnxruntime as ort
+        from transformers import BlipProcessor
+
+        with open(os.path.join(model_dir, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.processor = BlipProcessor.from_pretrained(model_dir)
+        self.past_names = [f"past_{i}_{kv}" for i in range(self.meta["num_layers"]) for kv in ("key", "value")]
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        sessions = {}
+        for graph in GRAPHS:
+            path = graph_path(model_dir, graph, quantized)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"{path} not found; run 'python onnx_caption.py export' first.")
+            sessions[graph] = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.vision_encoder = sessions["vision_encoder"]
+        self.decoder_init = sessions["decoder_init"]
+        self.decoder_with_past = sessions["decoder_with_past"]
+
+    def caption_batch(self, images: list) -> list:
+        pixel_values = self.processor(images=images, return_tensors="np")["pixel_values"].astype(np.float32)
+        image_embeds = self.vision_encoder.run(None, {"pixel_values": pixel_values})[0]
+
+        batch = len(images)
+        max_length = self.meta["max_length"]
+        tokens = [np.full((batch, 1), self.meta["bos_token_id"], dtype=np.int64)]
+        finished = np.zeros(batch, dtype=bool)
+        outputs = self.decoder_init.run(None, {"input_ids": tokens[0], "encoder_hidden_states": image_embeds})
+
+        while True:
+            next_ids = outputs[0].argmax(axis=-1).astype(np.int64)
+            next_ids = np.where(finished, self.meta["pad_token_id"], next_ids)
+            tokens.append(next_ids[:, None])
+            finished |= next_ids == self.meta["eos_token_id"]
+            if finished.all() or len(tokens) >= max_length:
+                break
+            feeds = {"input_ids": next_ids[:, None], "encoder_hidden_states": image_embeds}
+            feeds.update(zip(self.past_names, outputs[1:]))
+            outputs = self.decoder_with_past.run(None, feeds)
+
+        return self.processor.batch_decode(np.concatenate(tokens, axis=1), skip_special_tokens=True)
+
+
+def create_engine(name: str):
+    """
+    Build a caption engine by name ("torch", "onnx" or "onnx-fp32").
+    """
+    if name in ("onnx", "onnx-int8"):
+        return OnnxCaptionEngine(quantized=True)
+    if name == "onnx-fp32":
+        return OnnxCaptionEngine(quantized=False)
+    import torch
+    from transformers import BlipProcessor, BlipForConditionalGeneration
+    from caption_batcher import TorchCaptionEngine
+
+    device = torch.device("cuda") if torch.cuda.is_available() else torch.device("cpu")
+    blip_processor = BlipProcessor.from_pretrained(MODEL_ID)
+    blip_model = BlipForConditionalGeneration.from_pretrained(MODEL_ID).to(device)
+    return TorchCaptionEngine(blip_processor, blip_model, device)
+
+
+def load_images(paths: list, count: int = 8) -> list:
+    """
+    Load the given images, or generate keyframes from a synthetic video when none are given.
+    """
+    import io
+    import tempfile
+    from PIL import Image
+
+    if paths:
+        return [Image.open(path).convert("RGB") for path in paths]
+    from benchmarks.synthetic import make_video, make_keyframes
+
+    with tempfile.TemporaryDirectory() as workdir:
+        video_path = make_video(os.path.join(workdir, "sample.mp4"))
+        return [Image.open(io.BytesIO(jpeg)).convert("RGB") for jpeg in make_keyframes(video_path, count=count)]
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+
+def _bench_engine(name: str, images: list, iterations: int, batch_size: int, results):
+    from benchmarks.run import time_call
+
+    engine = create_engine(name)
+    loaded_rss = peak_rss_mb()
+    single = time_call(lambda: engine.caption_batch(images[:1]), iterations)
+    batched = time_call(lambda: engine.caption_batch(images[:batch_size]), iterations)
+    results.put({
+        "engine": name,
+        "single_image": single,
+        f"batch_of_{min(batch_size, len(images))}": batched,
+        "rss_after_load_mb": round(loaded_rss, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    })
+
+
+def bench(engines: list, images: list, iterations: int, batch_size: int) -> list:
+    """
+    Time each engine in its own process so that peak memory is measured in isolation.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for name in engines:
+        queue = context.Queue()
+        process = context.Process(target=_bench_engine, args=(name, images, iterations, batch_size, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+    return results
+
+
+def parity(images: list, quantized: bool) -> dict:
+    """
+    Compare ONNX captions with the PyTorch captions for the same images.
+    """
+    torch_captions = create_engine("torch").caption_batch(images)
+    onnx_captions = OnnxCaptionEngine(quantized=quantized).caption_batch(images)
+    pairs = [{"torch": t, "onnx": o, "match": t == o} for t, o in zip(torch_captions, onnx_captions)]
+    return {
+        "quantized": quantized,
+        "exact_match_rate": sum(pair["match"] for pair in pairs) / max(1, len(pairs)),
+        "captions": pairs,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export, check and benchmark the ONNX Runtime BLIP caption engine.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Export BLIP to ONNX (and int8) graphs.")
+    export_parser.add_argument("--output-dir", default=CAPTION_ONNX_DIR)
+    export_parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 copies.")
+    export_parser.add_argument("--opset", type=int, default=14)
+
+    parity_parser = commands.add_parser("parity", help="Compare ONNX captions with PyTorch captions.")
+    parity_parser.add_argument("images", nargs="*", help="Image files (default: synthetic keyframes).")
+    parity_parser.add_argument("--fp32", action="store_true", help="Check the fp32 graphs instead of int8.")
+
+    bench_parser = commands.add_parser("bench", help="Compare latency and memory of the engines.")
+    bench_parser.add_argument("images", nargs="*", help="Image files (default: synthetic keyframes).")
+    bench_parser.add_argument("--engines", default="torch,onnx-fp32,onnx-int8")
+    bench_parser.add_argument("--iterations", type=int, default=5)
+    bench_parser.add_argument("--batch-size", type=int, default=8)
+
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        export(args.output_dir, quantize=not args.no_quantize, opset=args.opset)
+        print(f"Exported BLIP graphs to {args.output_dir}")
+    elif args.command == "parity":
+        print(json.dumps(parity(load_images(args.images), quantized=not args.fp32), indent=2))
+    elif args.command == "bench":
+        images = load_images(args.images, count=args.batch_size)
+        engines = [name.strip() for name in args.engines.split(",") if name.strip()]
+        print(json.dumps(bench(engines, images, args.iterations, args.batch_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
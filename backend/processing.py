@@ -1,8 +1,11 @@
 import os
+import json
 import cv2
 import torch
+import numpy as np
 import logging
 import tempfile
+from concurrent.futures import Future
 from pathlib import Path
 from dotenv import load_dotenv
 import base64
@@ -14,6 +17,12 @@ from openai import OpenAI
 from PIL import Image
 from langchain_groq import ChatGroq  # New import for ChatGroq integration
 
+from metrics import timed, stage, FRAMES
+from inference_server import CaptionServerClient
+from caption_batcher import CaptionBatcher, TorchCaptionEngine, CAPTION_ENGINE, CAPTION_MAX_BATCH_SIZE
+from onnx_caption import OnnxCaptionEngine
+from frame_sampling import FrameSampler, FRAME_BUDGET, FRAME_MIN_INTERVAL_SECONDS
+
 # Load environment variables
 load_dotenv()
 
@@ -26,24 +35,43 @@ device = torch.device("cuda") if torch.cuda.is_available() else torch.device("cp
 
 
 class SurroundingAwarenessProcessor:
-    def __init__(self, sampling_rate: int = 40):
+    def __init__(self, frame_budget: int = FRAME_BUDGET, min_frame_interval: float = FRAME_MIN_INTERVAL_SECONDS):
         """
         Initialize the required models and clients once.
+        At most 'frame_budget' frames per video (or keyframe upload) are captioned and OCR'd,
+        spread over the clip's duration with at most one per 'min_frame_interval' seconds.
         This includes:
-          - BLIP (for image captioning / Q&A)
+          - BLIP (for image captioning / Q&A), loaded in-process or, with CAPTION_BACKEND=server,
+            served by the shared inference_server.py process. In-process captions go through a
+            micro-batching scheduler shared by all requests (disabled with CAPTION_MAX_BATCH_SIZE=1).
+            CAPTION_ENGINE=onnx runs the exported ONNX (optionally int8) graphs instead of PyTorch.
           - Mistral OCR client
           - TTS engine via pyttsx3
           - ChatGroq-based LLM client
         """
-        self.sampling_rate = sampling_rate
+        self.frame_sampler = FrameSampler(frame_budget, min_frame_interval)
+        self.caption_backend = os.getenv("CAPTION_BACKEND", "local").lower()
+        self.caption_client = None
+        self.caption_engine = None
+        self.caption_batcher = None
 
         # Initialize BLIP for image captioning / Q&A
         try:
-            # logger.debug("Loading BLIP processor and model...")
-            self.blip_processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-            
-            self.blip_model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base").to(device)
-            # logger.debug("BLIP model loaded successfully.")
+            if self.caption_backend == "server":
+                # The model lives in the shared inference server; this worker only keeps a client.
+                self.caption_client = CaptionServerClient()
+            else:
+                if CAPTION_ENGINE == "onnx":
+                    self.caption_engine = OnnxCaptionEngine()
+                else:
+                    # logger.debug("Loading BLIP processor and model...")
+                    self.blip_processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
+                    
+                    self.blip_model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base").to(device)
+                    self.caption_engine = TorchCaptionEngine(self.blip_processor, self.blip_model, device)
+                if CAPTION_MAX_BATCH_SIZE > 1:
+                    self.caption_batcher = CaptionBatcher(self.caption_engine)
+                # logger.debug("BLIP model loaded successfully.")
         except Exception as e:
             logger.error(f"Failed to load BLIP model: {e}")
             raise
@@ -90,10 +118,12 @@ class SurroundingAwarenessProcessor:
         # System prompt for LLM summarization (currently not used directly)
         # self.system_prompt = """ ... """
 
+    @timed("decode")
     def extract_frames(self, video_path: str) -> list:
         """
         Extract frames from the input video using OpenCV.
-        Sampling strategy: select one frame every 'sampling_rate' frames.
+        Sampling strategy: the frame budget is spread evenly over the clip's duration (read from
+        the container's frame count and FPS), always keeping the first and last frame.
         """
         frames = []
         try:
@@ -102,40 +132,47 @@ class SurroundingAwarenessProcessor:
                 logger.error("Error opening video file.")
                 return frames
 
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            # logger.debug(f"Total frames in video: {total_frames}")
-            current_frame = 0
-
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                if current_frame % self.sampling_rate == 0:
-                    frames.append(frame)
-                    # logger.debug(f"Extracted frame at index {current_frame}")
-                current_frame += 1
+            frames, frames_read = self.frame_sampler.sample(cap)
+            # logger.debug(f"Extracted {len(frames)} of {frames_read} frames")
+            FRAMES.inc(max(0, frames_read - len(frames)), outcome="skipped")
 
             cap.release()
         except Exception as e:
             logger.error(f"Error during frame extraction: {e}")
         return frames
 
+    @timed("caption")
     def get_caption(self, image: Image.Image) -> str:
         """
         Use the BLIP model to generate a caption for the image.
+        With CAPTION_BACKEND=server the frame is captioned by the shared inference server.
         """
         try:
+            if self.caption_client is not None:
+                return self.caption_client.caption(np.asarray(image.convert("RGB")))
+            if self.caption_batcher is not None:
+                return self.caption_batcher.caption(image)
             # Optionally, you could include a text prompt for Q&A here.
-            inputs = self.blip_processor(images=image, return_tensors="pt").to(device)
-            output = self.blip_model.generate(**inputs)
-            caption = self.blip_processor.decode(output[0], skip_special_tokens=True)
+            caption = self.caption_engine.caption_batch([image])[0]
             # logger.debug(f"BLIP output: {caption}")
             return caption
         except Exception as e:
             logger.error(f"Error in BLIP caption generation: {e}")
             return ""
 
+    def submit_caption(self, image: Image.Image) -> Future:
+        """
+        Start captioning an image and return a Future for the caption. With the batcher enabled,
+        captions of several frames (and of concurrent requests) share one forward pass; otherwise
+        the caption is computed right away.
+        """
+        if self.caption_client is None and self.caption_batcher is not None:
+            return self.caption_batcher.submit(image)
+        future = Future()
+        future.set_result(self.get_caption(image))
+        return future
+
+    @timed("ocr")
     def get_ocr_text(self, frame: any) -> str:
         """
         Save the frame as a temporary file, encode it in base64, and perform OCR extraction
@@ -202,31 +239,70 @@ class SurroundingAwarenessProcessor:
           - Aggregate the outputs into combined text for summarization.
         Returns a dictionary with keys 'combined_text' and 'frame_details' for debugging.
         """
-        combined_texts = []
-        frame_details = []
-
         frames = self.extract_frames(video_path)
         if not frames:
             logger.error("No frames extracted from video.")
-            return {"combined_text": "", "frame_details": frame_details}
+            return {"combined_text": "", "frame_details": []}
+        return self.process_frames(frames)
 
+    def process_frames(self, frames: list) -> dict:
+        """
+        Generate caption (via BLIP) and perform OCR (via Mistral OCR) for each frame (BGR arrays),
+        and aggregate the outputs into combined text for summarization.
+        Used directly for keyframes selected on the client, skipping video decoding.
+        Returns a dictionary with keys 'combined_text' and 'frame_details' for debugging.
+        """
+        combined_texts = []
+        frame_details = []
+        pending = []
+
+        # Queue every caption up front so the batcher can caption the frames together
+        # while OCR runs below.
         for idx, frame in enumerate(frames):
             try:
                 image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
             except Exception as e:
                 logger.error(f"Error converting frame {idx} to PIL image: {e}")
+                FRAMES.inc(outcome="skipped")
                 continue
+            pending.append((idx, frame, self.submit_caption(image)))
 
-            caption = self.get_caption(image)
+        for idx, frame, caption_future in pending:
             ocr_text = self.get_ocr_text(frame)
+            try:
+                with stage("caption_wait"):
+                    caption = caption_future.result()
+            except Exception as e:
+                logger.error(f"Error in BLIP caption generation: {e}")
+                caption = ""
             frame_text = f"Caption: {caption} | OCR: {ocr_text}"
             combined_texts.append(frame_text)
             frame_details.append({"frame_index": idx, "caption": caption, "ocr": ocr_text})
+            FRAMES.inc(outcome="processed")
             # logger.debug(f"Processed frame {idx}")
 
         all_text = "\n".join(combined_texts)
         return {"combined_text": all_text, "frame_details": frame_details}
 
+    @timed("decode")
+    def decode_frames(self, images: list) -> list:
+        """
+        Decode encoded images (e.g. JPEG bytes uploaded by the client) into BGR frames.
+        Images that cannot be decoded are skipped. Callers thin uploads to the frame budget first
+        (see /process_frames/).
+        """
+        frames = []
+        for idx, image_bytes in enumerate(images):
+            try:
+                frame = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if frame is None:
+                    raise ValueError("not a valid image")
+                frames.append(frame)
+            except Exception as e:
+                logger.error(f"Error decoding uploaded frame {idx}: {e}")
+        return frames
+
+    @timed("llm_summary")
     def generate_llm_summary(self, combined_text: str) -> str:
         """
         Generate a surrounding awareness summary using ChatGroq (LLM).
@@ -252,6 +328,40 @@ class SurroundingAwarenessProcessor:
             logger.error(f"Error in LLM summarization: {e}")
             return ""
 
+    @timed("llm_summary_update")
+    def update_llm_summary(self, previous_summary: str, new_observations: str) -> tuple:
+        """
+        Revise a live scene summary with observations made since it was written, instead of
+        summarizing everything seen so far from scratch.
+        Returns (summary, change): the revised summary and one sentence about what is new
+        (empty when nothing noteworthy changed). Returns ("", "") on failure.
+        """
+        try:
+            system_prompt = """
+                You are a virtual AI assistant helping a visually impaired person who is moving through a space, by keeping a live description of their surroundings up to date.
+                You receive the current description (empty at first) and new observations of the scene made since it was written.
+                Revise the description so that it reflects the surroundings as they are now: add what is new, keep what is still relevant and drop what the person has clearly left behind.
+                The description must be a single natural paragraph of at most 120 words, without special characters, line breaks or bullet points, and without referencing how the information was obtained.
+                Also write one short sentence telling the person what is new or has changed, or an empty string if nothing noteworthy changed.
+                Return only a JSON object of the form {"summary": "...", "change": "..."}.
+            """
+            messages = [
+                ("system", system_prompt),
+                ("human", f"Current description:\n{previous_summary}\n\nNew observations:\n{new_observations}")
+            ]
+            content = self.llm.invoke(messages).content.strip()
+            try:
+                start, end = content.find("{"), content.rfind("}")
+                result = json.loads(content[start:end + 1])
+                return str(result.get("summary", "")).strip(), str(result.get("change", "")).strip()
+            except ValueError:
+                # Not JSON after all; take the reply as the revised summary.
+                return content, ""
+        except Exception as e:
+            logger.error(f"Error in LLM summary update: {e}")
+            return "", ""
+
+    @timed("tts")
     def generate_audio(self, text: str, output_path: str = "output.mp3") -> bool:
         """
         Convert the LLM summary text into speech using pyttsx3 and save as an MP3 file.
@@ -0,0 +1,182 @@
+import os
+import re
+import sys
+import time
+import uuid
+import random
+import logging
+import threading
+import contextvars
+
+# Set up logging (only errors and warnings are shown)
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Profiling is opt-in: a request is profiled when it carries the admin header matching
+# PROFILE_ADMIN_TOKEN, or when it is picked by PROFILE_SAMPLE_RATE (0.0 - 1.0).
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_SECONDS", "0.005"))
+PROFILE_HEADER = "x-profile-token"
+
+# When neither trigger is configured nothing is wrapped or sampled at all.
+ENABLED = bool(PROFILE_ADMIN_TOKEN) or PROFILE_SAMPLE_RATE > 0
+
+_active_session = contextvars.ContextVar("profile_session", default=None)
+
+
+class ProfileSession:
+    """
+    Statistical profiler for one request.
+    A sampler thread periodically captures the Python stacks of the threads currently working
+    for the request (executor threads register themselves through track_thread) and aggregates
+    them in collapsed-stack format ("frame;frame;frame count"), which flamegraph.pl, speedscope
+    and similar tools read directly. Native code such as model inference shows up under the
+    Python frame that called it.
+    """
+
+    def __init__(self, name: str, interval: float = PROFILE_INTERVAL_SECONDS):
+        self.name = name
+        self.interval = interval
+        self.samples = {}
+        self._threads = {}  # ident -> number of active registrations
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+        self.started_at = time.time()
+        self.duration = 0.0
+
+    def start(self):
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join(timeout=1.0)
+        self.duration = time.time() - self.started_at
+
+    def add_thread(self, ident: int):
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def remove_thread(self, ident: int):
+        with self._lock:
+            remaining = self._threads.get(ident, 0) - 1
+            if remaining > 0:
+                self._threads[ident] = remaining
+            else:
+                self._threads.pop(ident, None)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                idents = list(self._threads)
+            if not idents:
+                continue
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.samples.items()))
+
+
+def should_profile(headers) -> bool:
+    """
+    Decide whether a request is profiled (admin header or sampling).
+    """
+    if not ENABLED:
+        return False
+    if PROFILE_ADMIN_TOKEN and headers.get(PROFILE_HEADER) == PROFILE_ADMIN_TOKEN:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def is_admin(headers) -> bool:
+    return bool(PROFILE_ADMIN_TOKEN) and headers.get(PROFILE_HEADER) == PROFILE_ADMIN_TOKEN
+
+
+def start_session(label: str) -> ProfileSession:
+    """
+    Start profiling the current request. The session follows the request into executor
+    threads through the context copied by metrics.run_in_executor.
+    """
+    safe_label = re.sub(r"[^A-Za-z0-9_-]+", "_", label).strip("_") or "request"
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}_{safe_label}_{uuid.uuid4().hex[:8]}"
+    session = ProfileSession(name).start()
+    _active_session.set(session)
+    return session
+
+
+def current_session():
+    """
+    Return the ProfileSession of the request being handled, or None when it is not profiled.
+    """
+    return _active_session.get() if ENABLED else None
+
+
+def track_thread(func, *args):
+    """
+    Run func(*args) on the current (executor) thread, sampling it if the request is being profiled.
+    """
+    session = current_session()
+    if session is None:
+        return func(*args)
+    ident = threading.get_ident()
+    session.add_thread(ident)
+    try:
+        return func(*args)
+    finally:
+        session.remove_thread(ident)
+
+
+def save_session(session: ProfileSession) -> str:
+    """
+    Stop the session, write it to PROFILE_DIR as '<name>.folded' and drop the oldest profiles
+    beyond PROFILE_MAX_FILES. Returns the file name.
+    """
+    session.stop()
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    filename = f"{session.name}.folded"
+    with open(os.path.join(PROFILE_DIR, filename), "w") as f:
+        f.write(session.collapsed())
+    try:
+        profiles = sorted(list_profiles(), key=lambda p: p["created"], reverse=True)
+        for stale in profiles[PROFILE_MAX_FILES:]:
+            os.remove(os.path.join(PROFILE_DIR, stale["name"]))
+    except Exception as e:
+        logger.warning(f"Could not prune old profiles: {e}")
+    return filename
+
+
+def list_profiles() -> list:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        if not name.endswith(".folded"):
+            continue
+        stat = os.stat(os.path.join(PROFILE_DIR, name))
+        profiles.append({"name": name, "size": stat.st_size, "created": stat.st_mtime})
+    return sorted(profiles, key=lambda p: p["created"], reverse=True)
+
+
+def profile_path(name: str):
+    """
+    Return the path of a saved profile, or None if it does not exist (or the name is not a plain file name).
+    """
+    if os.path.basename(name) != name or not name.endswith(".folded"):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
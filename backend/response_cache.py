@@ -0,0 +1,105 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+
+from metrics import RESPONSE_CACHE_REQUESTS, RESPONSE_CACHE_ENTRIES
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+
+# Words that do not change the meaning of a spoken question. Auxiliaries and tense words
+# (is/was, do/did, can/will, ...) and question words are kept, so that "who is ..." and
+# "who was ..." stay different questions.
+FOLDED_WORDS = {"a", "an", "the", "please", "um", "uh", "just"}
+
+# Polite openings that only wrap the actual question ("hey Tavi, can you tell me what is ...").
+LEADING_FILLER = re.compile(
+    r"^(?:(?:hey|hi|hello|ok|okay|so|um|uh|tavi|jarvis|quick question)\s+)*"
+    r"(?:(?:can|could|would|will) you (?:please )?tell me\s+|(?:do|did) you know\s+|i want to know\s+|tell me\s+)?"
+)
+
+# Answers to these change over time (clock, calendar, weather, news, prices), so they are never cached.
+VOLATILE_WORDS = {
+    "time", "date", "day", "today", "tonight", "tomorrow", "yesterday", "now", "currently", "current",
+    "latest", "recent", "weather", "temperature", "forecast", "rain", "raining", "snow", "sunny", "news",
+    "score", "price", "stock", "traffic", "open", "week", "month", "year",
+}
+
+
+def _words(text: str) -> list:
+    text = re.sub(r"['\u2019]s\b", " is", text.lower())  # "what's" -> "what is"
+    return re.findall(r"[a-z0-9]+", re.sub(r"['\u2019]", "", text))
+
+
+def normalize_query(text: str) -> str:
+    """
+    Cache key for a transcript: lower case, no punctuation, polite openings and filler words folded away.
+    """
+    text = LEADING_FILLER.sub("", " ".join(_words(text)))
+    return " ".join(word for word in text.split() if word not in FOLDED_WORDS)
+
+
+def is_volatile(text: str) -> bool:
+    """
+    True for time- or weather-sensitive questions, whose answers must not be reused.
+    """
+    return any(word in VOLATILE_WORDS for word in _words(text))
+
+
+class CachedResponse:
+    def __init__(self, text: str, audio: bytes, expires_at: float):
+        self.text = text
+        self.audio = audio
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: float = RESPONSE_CACHE_TTL_SECONDS):
+        """
+        TTL + LRU cache of answers (text and synthesized audio) keyed on the normalized transcript.
+        Set max_entries to 0 to disable caching.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> CachedResponse, least recently used first
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, query: str):
+        """
+        Return the CachedResponse for a transcript, or None (and record the hit or miss).
+        Time- and weather-sensitive questions are never answered from the cache.
+        """
+        if is_volatile(query):
+            self.record_bypass()
+            return None
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+            RESPONSE_CACHE_ENTRIES.set(len(self._entries))
+        RESPONSE_CACHE_REQUESTS.inc(result="hit" if entry is not None else "miss")
+        return entry
+
+    def put(self, query: str, text: str, audio: bytes):
+        key = normalize_query(query)
+        if not key or not self.enabled or is_volatile(query):
+            return
+        with self._lock:
+            self._entries[key] = CachedResponse(text, audio, time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            RESPONSE_CACHE_ENTRIES.set(len(self._entries))
+
+    def record_bypass(self):
+        RESPONSE_CACHE_REQUESTS.inc(result="bypass")
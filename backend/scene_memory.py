@@ -0,0 +1,231 @@
+import os
+import re
+import math
+import time
+import sqlite3
+import logging
+import threading
+from collections import Counter
+
+# Set up logging (only errors and warnings are shown)
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+SCENE_MEMORY_DB = os.getenv("SCENE_MEMORY_DB", os.path.join("scene_memory", "scene_memory.db"))
+SCENE_MEMORY_MAX_RECORDINGS = int(os.getenv("SCENE_MEMORY_MAX_RECORDINGS", "50"))
+SCENE_MEMORY_TOP_K = int(os.getenv("SCENE_MEMORY_TOP_K", "6"))
+MAX_SNIPPET_CHARS = 600  # Long OCR pages are cut so a single snippet cannot flood the prompt
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from", "has", "have", "i",
+    "in", "is", "it", "its", "me", "my", "of", "on", "or", "that", "the", "there", "this", "to",
+    "was", "what", "where", "which", "who", "with", "you", "your", "any", "see", "tell", "about",
+}
+
+
+def tokenize(text: str) -> list:
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS]
+
+
+def ocr_to_text(ocr) -> str:
+    """
+    Plain text of an OCR result: the page markdown of a Mistral OCR response, or the value as a string.
+    """
+    if not ocr:
+        return ""
+    pages = getattr(ocr, "pages", None)
+    if pages is not None:
+        return "\n".join(getattr(page, "markdown", "") or "" for page in pages).strip()
+    return str(ocr).strip()
+
+
+def age_label(seconds: float) -> str:
+    if seconds < 90:
+        return "just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} h ago"
+    return f"{int(seconds // 86400)} days ago"
+
+
+class SceneMemory:
+    def __init__(self, db_path: str = SCENE_MEMORY_DB, max_recordings: int = SCENE_MEMORY_MAX_RECORDINGS, k1: float = 1.5, b: float = 0.75):
+        """
+        Scene memory across recordings.
+        The per-frame captions and OCR text of every recording (plus its summary) are stored in
+        sqlite and indexed in memory with BM25, so a query only pulls the few snippets that are
+        relevant to it instead of a whole summary. The oldest recordings beyond 'max_recordings'
+        are dropped. Several processes can share the database: rows written or dropped by another
+        process are picked up before each search.
+        """
+        self.db_path = db_path
+        self.max_recordings = max_recordings
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._snippets = {}   # snippet id -> dict(text, kind, recording_id, frame_index, created_at, length)
+        self._postings = {}   # term -> {snippet id: term frequency}
+        self._total_length = 0
+        self._last_id = 0     # highest snippet id indexed so far
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS recordings (id TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS snippets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    recording_id TEXT NOT NULL,
+                    frame_index INTEGER,
+                    kind TEXT NOT NULL,
+                    text TEXT NOT NULL
+                )
+                """
+            )
+            self._refresh(conn)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _refresh(self, conn):
+        """
+        Bring the in-memory index in line with sqlite: index snippets added since the last refresh
+        and unindex snippets whose recording was dropped (possibly by another process).
+        Expects self._lock to be held by the caller (or the index not to be shared yet).
+        """
+        rows = conn.execute(
+            "SELECT s.id, s.recording_id, s.frame_index, s.kind, s.text, r.created_at "
+            "FROM snippets s JOIN recordings r ON r.id = s.recording_id WHERE s.id > ? ORDER BY s.id",
+            (self._last_id,),
+        ).fetchall()
+        for row in rows:
+            self._index(row[0], row[4], row[3], row[1], row[2], row[5])
+            self._last_id = row[0]
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM snippets s JOIN recordings r ON r.id = s.recording_id"
+        ).fetchone()
+        if count != len(self._snippets):
+            live = {snippet_id for (snippet_id,) in conn.execute(
+                "SELECT s.id FROM snippets s JOIN recordings r ON r.id = s.recording_id"
+            ).fetchall()}
+            for snippet_id in [sid for sid in self._snippets if sid not in live]:
+                self._unindex(snippet_id)
+
+    def _index(self, snippet_id: int, text: str, kind: str, recording_id: str, frame_index, created_at: float):
+        terms = Counter(tokenize(text))
+        length = sum(terms.values())
+        self._snippets[snippet_id] = {
+            "text": text,
+            "kind": kind,
+            "recording_id": recording_id,
+            "frame_index": frame_index,
+            "created_at": created_at,
+            "length": length,
+        }
+        self._total_length += length
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[snippet_id] = count
+
+    def _unindex(self, snippet_id: int):
+        snippet = self._snippets.pop(snippet_id, None)
+        if snippet is None:
+            return
+        self._total_length -= snippet["length"]
+        for term in set(tokenize(snippet["text"])):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(snippet_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def add_recording(self, recording_id: str, frame_details: list, summary: str = "", created_at: float = None):
+        """
+        Store a recording's per-frame captions and OCR text (as produced by process_frames) and its summary.
+        Identical snippets within one recording are stored once. Adding a recording id that already
+        exists replaces it (used to update a live-scene session in place).
+        """
+        created_at = created_at or time.time()
+        entries = []
+        seen = set()
+        if summary.strip():
+            entries.append((None, "summary", summary.strip()))
+        for detail in frame_details:
+            for kind, text in (("caption", str(detail.get("caption") or "").strip()), ("ocr", ocr_to_text(detail.get("ocr")))):
+                text = text[:MAX_SNIPPET_CHARS]
+                if text and (kind, text.lower()) not in seen:
+                    seen.add((kind, text.lower()))
+                    entries.append((detail.get("frame_index"), kind, text))
+        if not entries:
+            return
+
+        with self._lock:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO recordings (id, summary, created_at) VALUES (?, ?, ?)",
+                    (recording_id, summary, created_at),
+                )
+                conn.execute("DELETE FROM snippets WHERE recording_id = ?", (recording_id,))
+                conn.executemany(
+                    "INSERT INTO snippets (recording_id, frame_index, kind, text) VALUES (?, ?, ?, ?)",
+                    [(recording_id, frame_index, kind, text) for frame_index, kind, text in entries],
+                )
+                stale = conn.execute(
+                    "SELECT id FROM recordings ORDER BY created_at DESC LIMIT -1 OFFSET ?", (self.max_recordings,)
+                ).fetchall()
+                for (stale_id,) in stale:
+                    for (snippet_id,) in conn.execute("SELECT id FROM snippets WHERE recording_id = ?", (stale_id,)).fetchall():
+                        self._unindex(snippet_id)
+                    conn.execute("DELETE FROM snippets WHERE recording_id = ?", (stale_id,))
+                    conn.execute("DELETE FROM recordings WHERE id = ?", (stale_id,))
+                self._refresh(conn)
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            with self._connect() as conn:
+                self._refresh(conn)
+            return not self._snippets
+
+    def search(self, query: str, k: int = SCENE_MEMORY_TOP_K) -> list:
+        """
+        Top-k snippets for the query by BM25 (ties go to the more recent recording).
+        If nothing matches, the latest recording's snippets are returned instead, so that vague
+        questions ("what's in front of me?") still get the most recent scene.
+        """
+        with self._lock:
+            with self._connect() as conn:
+                self._refresh(conn)
+            if not self._snippets:
+                return []
+            count = len(self._snippets)
+            average_length = self._total_length / count or 1.0
+            scores = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for snippet_id, frequency in postings.items():
+                    length = self._snippets[snippet_id]["length"]
+                    norm = frequency * (self.k1 + 1) / (frequency + self.k1 * (1 - self.b + self.b * length / average_length))
+                    scores[snippet_id] = scores.get(snippet_id, 0.0) + idf * norm
+
+            if scores:
+                ranked = sorted(scores, key=lambda sid: (scores[sid], self._snippets[sid]["created_at"]), reverse=True)[:k]
+            else:
+                latest = max(self._snippets.values(), key=lambda s: s["created_at"])["recording_id"]
+                ranked = [sid for sid, s in sorted(self._snippets.items()) if s["recording_id"] == latest][:k]
+            return [dict(self._snippets[sid], score=scores.get(sid, 0.0)) for sid in ranked]
+
+    def context_for(self, query: str, k: int = SCENE_MEMORY_TOP_K) -> str:
+        """
+        The top-k snippets formatted for an LLM prompt, one per line, with how long ago they were recorded.
+        Returns an empty string when nothing has been recorded yet.
+        """
+        now = time.time()
+        lines = []
+        for snippet in self.search(query, k):
+            label = {"summary": "Summary", "caption": "Scene", "ocr": "Text seen"}[snippet["kind"]]
+            lines.append(f"- [{age_label(now - snippet['created_at'])}] {label}: {snippet['text']}")
+        return "\n".join(lines)
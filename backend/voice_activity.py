@@ -0,0 +1,141 @@
+import os
+import wave
+import logging
+
+import numpy as np
+
+try:
+    import webrtcvad  # Optional: more robust detection in noisy environments
+except ImportError:
+    webrtcvad = None
+
+# Set up logging (only errors and warnings are shown)
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class VoiceActivityDetector:
+    def __init__(
+        self,
+        frame_ms: int = 30,
+        energy_margin_db: float = 12.0,
+        min_energy_db: float = -50.0,
+        max_noise_floor_db: float = -45.0,
+        min_speech_ms: int = 200,
+        padding_ms: int = 200,
+        webrtc_aggressiveness: int = 2,
+    ):
+        """
+        Energy-based voice activity detector.
+        A frame is classed as speech when its RMS level (dBFS) is at least 'energy_margin_db'
+        above the estimated noise floor and above 'min_energy_db'. The noise floor is capped at
+        'max_noise_floor_db' so that a recording which is speech from end to end is not
+        mistaken for loud background noise. If the optional webrtcvad package is installed
+        it is used instead of the energy threshold.
+        """
+        self.frame_ms = frame_ms
+        self.energy_margin_db = energy_margin_db
+        self.min_energy_db = min_energy_db
+        self.max_noise_floor_db = max_noise_floor_db
+        self.min_speech_ms = min_speech_ms
+        self.padding_ms = padding_ms
+        self.webrtc_vad = webrtcvad.Vad(webrtc_aggressiveness) if webrtcvad is not None else None
+
+    def frame_flags(self, samples: np.ndarray, sample_rate: int) -> list:
+        """
+        Split mono int16 samples into fixed-size frames and flag each one as speech or not.
+        """
+        frame_len = int(sample_rate * self.frame_ms / 1000)
+        if frame_len <= 0 or len(samples) < frame_len:
+            return []
+        n_frames = len(samples) // frame_len
+        frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len)
+
+        if self.webrtc_vad is not None and sample_rate in (8000, 16000, 32000, 48000) and self.frame_ms in (10, 20, 30):
+            return [self.webrtc_vad.is_speech(frame.tobytes(), sample_rate) for frame in frames]
+
+        rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+        energy_db = 20.0 * np.log10(np.maximum(rms, 1.0) / 32768.0)
+        noise_floor_db = min(np.percentile(energy_db, 10), self.max_noise_floor_db)
+        threshold_db = max(noise_floor_db + self.energy_margin_db, self.min_energy_db)
+        return list(energy_db >= threshold_db)
+
+    def speech_bounds(self, samples: np.ndarray, sample_rate: int):
+        """
+        Return (start_sample, end_sample) covering the detected speech, padded on both sides,
+        or None if there is not enough speech in the signal.
+        """
+        flags = self.frame_flags(samples, sample_rate)
+        frame_len = int(sample_rate * self.frame_ms / 1000)
+        speech_frames = [i for i, is_speech in enumerate(flags) if is_speech]
+        if len(speech_frames) * self.frame_ms < self.min_speech_ms:
+            return None
+
+        padding = int(sample_rate * self.padding_ms / 1000)
+        start = max(0, speech_frames[0] * frame_len - padding)
+        end = min(len(samples), (speech_frames[-1] + 1) * frame_len + padding)
+        return start, end
+
+
+def read_wav_mono(path: str):
+    """
+    Read a 16-bit PCM WAV file and return (mono int16 samples, sample_rate).
+    Multi-channel audio is down-mixed by averaging. Raises ValueError for other sample widths.
+    """
+    with wave.open(path, "rb") as wf:
+        channels = wf.getnchannels()
+        sample_width = wf.getsampwidth()
+        sample_rate = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+    if sample_width != 2:
+        raise ValueError(f"Unsupported sample width: {sample_width * 8} bits")
+    samples = np.frombuffer(raw, dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, sample_rate
+
+
+def write_wav_mono(path: str, samples: np.ndarray, sample_rate: int) -> None:
+    """
+    Write mono int16 samples to a WAV file.
+    """
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.astype(np.int16).tobytes())
+
+
+def trim_silence(audio_path: str, output_path: str, detector: VoiceActivityDetector = None) -> dict:
+    """
+    Trim leading and trailing silence from a WAV file.
+    Returns a dictionary with:
+      - has_speech: False if no speech was detected (the STT call can be skipped)
+      - path: the file to send to STT (trimmed copy, or the original if trimming was not possible)
+      - original_seconds / trimmed_seconds: durations for logging and metrics
+    Any file that cannot be analysed is passed through unchanged and treated as speech.
+    """
+    detector = detector or VoiceActivityDetector()
+    try:
+        samples, sample_rate = read_wav_mono(audio_path)
+    except Exception as e:
+        logger.warning(f"Skipping voice activity detection for {os.path.basename(audio_path)}: {e}")
+        return {"has_speech": True, "path": audio_path, "original_seconds": None, "trimmed_seconds": None}
+
+    original_seconds = len(samples) / sample_rate if sample_rate else 0.0
+    bounds = detector.speech_bounds(samples, sample_rate)
+    if bounds is None:
+        return {"has_speech": False, "path": audio_path, "original_seconds": original_seconds, "trimmed_seconds": 0.0}
+
+    start, end = bounds
+    try:
+        write_wav_mono(output_path, samples[start:end], sample_rate)
+    except Exception as e:
+        logger.error(f"Error writing trimmed audio: {e}")
+        return {"has_speech": True, "path": audio_path, "original_seconds": original_seconds, "trimmed_seconds": original_seconds}
+    return {
+        "has_speech": True,
+        "path": output_path,
+        "original_seconds": original_seconds,
+        "trimmed_seconds": (end - start) / sample_rate,
+    }
@@ -0,0 +1,133 @@
+import threading
+
+import pyaudio
+
+
+class AudioCapture:
+    """
+    A single long-lived microphone capture thread feeding a fixed-size ring buffer.
+    The capture thread is the only writer: it stores each frame in its slot and then
+    publishes the new write index, so readers never block it and it never waits on them.
+    Any number of readers (wake word detector, recorder) keep their own cursor into the
+    buffer and can start a little in the past to get a pre-roll.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_length: int = 512, capacity_seconds: float = 10.0):
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.sample_width = 2  # paInt16
+        self.capacity = max(1, int(capacity_seconds * sample_rate / frame_length))
+        self._slots = [None] * self.capacity
+        self._write_index = 0  # Total number of frames written so far.
+        self._new_frame = threading.Condition()
+        self._running = False
+        self._thread = None
+        self.error = None
+
+    @property
+    def write_index(self) -> int:
+        return self._write_index
+
+    def frames_for_seconds(self, seconds: float) -> int:
+        return int(seconds * self.sample_rate / self.frame_length)
+
+    def start(self):
+        """
+        Open the input stream once and start the capture thread.
+        """
+        if self._running:
+            return
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(
+            rate=self.sample_rate,
+            channels=1,
+            format=pyaudio.paInt16,
+            input=True,
+            frames_per_buffer=self.frame_length,
+        )
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        try:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._pa.terminate()
+        except Exception:
+            pass
+        with self._new_frame:
+            self._new_frame.notify_all()
+
+    def _capture_loop(self):
+        try:
+            while self._running:
+                frame = self._stream.read(self.frame_length, exception_on_overflow=False)
+                index = self._write_index
+                self._slots[index % self.capacity] = frame
+                self._write_index = index + 1
+                with self._new_frame:
+                    self._new_frame.notify_all()
+        except Exception as e:
+            self.error = e
+            self._running = False
+            with self._new_frame:
+                self._new_frame.notify_all()
+
+    def reader(self, preroll_seconds: float = 0.0, start_index: int = None):
+        """
+        Create a reader positioned at 'start_index' (default: the newest frame),
+        optionally rewound by a pre-roll.
+        """
+        if start_index is None:
+            start_index = self._write_index
+        start = start_index - self.frames_for_seconds(preroll_seconds)
+        return CaptureReader(self, start)
+
+
+class CaptureReader:
+    """
+    An independent cursor into an AudioCapture ring buffer.
+    """
+
+    def __init__(self, capture: AudioCapture, start_index: int):
+        self.capture = capture
+        self.cursor = max(0, start_index, capture.write_index - capture.capacity)
+        self.dropped_frames = 0
+
+    def seek_to_latest(self):
+        """
+        Skip everything captured so far, e.g. after the reader was paused.
+        """
+        self.cursor = self.capture.write_index
+
+    def read(self, timeout: float = 1.0) -> bytes:
+        """
+        Return the next frame, waiting for the capture thread if necessary.
+        If the reader fell more than a full buffer behind, it skips ahead to the oldest
+        frame still available. Raises RuntimeError if capture has stopped.
+        """
+        capture = self.capture
+        if self.cursor >= capture.write_index:
+            with capture._new_frame:
+                capture._new_frame.wait_for(
+                    lambda: self.cursor < capture.write_index or not capture._running,
+                    timeout=timeout,
+                )
+            if self.cursor >= capture.write_index:
+                if capture.error is not None:
+                    raise RuntimeError(f"Audio capture failed: {capture.error}")
+                if not capture._running:
+                    raise RuntimeError("Audio capture stopped.")
+                raise TimeoutError("No audio received from the microphone.")
+
+        oldest = capture.write_index - capture.capacity
+        if self.cursor < oldest:
+            self.dropped_frames += oldest - self.cursor
+            self.cursor = oldest
+        frame = capture._slots[self.cursor % capture.capacity]
+        self.cursor += 1
+        return frame
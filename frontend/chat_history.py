@@ -0,0 +1,196 @@
+import os
+
+from kivy.clock import Clock
+from kivy.lang import Builder
+from kivy.metrics import dp
+from kivy.properties import BooleanProperty, NumericProperty, StringProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.image import Image
+from kivy.uix.label import Label
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.video import Video
+
+from config import CHAT_HISTORY_MAX_ENTRIES, MAX_ACTIVE_VIDEOS
+
+MESSAGE_MIN_HEIGHT = dp(30)
+VIDEO_ROW_HEIGHT = dp(224)
+
+KV = '''
+<MessageRow>:
+    markup: True
+    size_hint_y: None
+    text_size: self.width, None
+    halign: 'left'
+    valign: 'middle'
+    padding: dp(6), dp(4)
+
+<VideoRow>:
+    orientation: 'vertical'
+    size_hint_y: None
+    height: dp(224)
+    BoxLayout:
+        id: stage
+    Label:
+        size_hint_y: None
+        height: '24dp'
+        text: root.hint
+
+<ChatHistory>:
+    viewclass: 'MessageRow'
+    key_viewclass: 'viewclass'
+    do_scroll_x: False
+    do_scroll_y: True
+    RecycleBoxLayout:
+        orientation: 'vertical'
+        default_size: None, dp(30)
+        default_size_hint: 1, None
+        size_hint_y: None
+        height: self.minimum_height
+        key_size: 'view_size'
+'''
+
+Builder.load_string(KV)
+
+
+class MessageRow(RecycleDataViewBehavior, Label):
+    """
+    Recycled text entry. Its height follows the wrapped text and is written back to the
+    entry's data so the layout can place rows without creating them.
+    """
+    index = NumericProperty(-1)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.rv = rv
+        self.index = index
+        super().refresh_view_attrs(rv, index, data)
+
+    def on_texture_size(self, instance, texture_size):
+        rv = getattr(self, "rv", None)
+        if rv is None or not 0 <= self.index < len(rv.data):
+            return
+        height = max(MESSAGE_MIN_HEIGHT, texture_size[1] + dp(8))
+        entry = rv.data[self.index]
+        if entry.get("viewclass") == "MessageRow" and entry.get("view_size", (None, 0))[1] != height:
+            rv.data[self.index] = dict(entry, view_size=(None, height))
+
+
+class VideoRow(RecycleDataViewBehavior, BoxLayout):
+    """
+    Recycled video entry: shows the recording's thumbnail, and a looping Video player only
+    while the entry is playing. Rows that are recycled or stopped release their decoder.
+    """
+    index = NumericProperty(-1)
+    entry_id = NumericProperty(-1)
+    source = StringProperty("")
+    thumbnail = StringProperty("")
+    playing = BooleanProperty(False)
+    hint = StringProperty("")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.rv = None
+        self.video = None
+        self.thumbnail_image = Image(allow_stretch=True, keep_ratio=True)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.rv = rv
+        self.index = index
+        super().refresh_view_attrs(rv, index, data)
+        self._update_player()
+
+    def on_parent(self, instance, parent):
+        # Rows scrolled out of view are detached from the layout; do not keep decoding off screen.
+        if parent is None:
+            self._release_video()
+        elif "stage" in self.ids:
+            self._update_player()
+
+    def _update_player(self):
+        stage = self.ids.stage
+        available = os.path.exists(self.source)
+        if self.playing and available:
+            if self.video is None or self.video.source != self.source:
+                self._release_video()
+                self.video = Video(source=self.source, state="play", options={"eos": "loop"})
+            if self.video.parent is None:
+                stage.clear_widgets()
+                stage.add_widget(self.video)
+            self.hint = "Tap to stop"
+            return
+
+        self._release_video()
+        self.thumbnail_image.source = self.thumbnail if os.path.exists(self.thumbnail) else ""
+        if self.thumbnail_image.parent is None:
+            stage.clear_widgets()
+            stage.add_widget(self.thumbnail_image)
+        self.hint = "Tap to play" if available else "Video no longer available"
+
+    def _release_video(self):
+        if self.video is not None:
+            self.video.state = "stop"
+            self.video.unload()
+            if self.video.parent is not None:
+                self.video.parent.remove_widget(self.video)
+            self.video = None
+
+    def on_touch_down(self, touch):
+        if self.collide_point(*touch.pos) and self.rv is not None:
+            self.rv.toggle_video(self.entry_id)
+            return True
+        return super().on_touch_down(touch)
+
+
+class ChatHistory(RecycleView):
+    """
+    Virtualized chat history: entries are plain dicts in 'data' and only the rows on screen
+    exist as widgets. Each entry names its row class under 'viewclass', so text and video rows
+    are recycled separately. At most 'max_entries' entries are kept, and at most 'max_active_videos'
+    video entries play at once (starting another stops the one started first).
+    """
+
+    def __init__(self, max_entries=CHAT_HISTORY_MAX_ENTRIES, max_active_videos=MAX_ACTIVE_VIDEOS, **kwargs):
+        super().__init__(**kwargs)
+        self.max_entries = max_entries
+        self.max_active_videos = max(1, max_active_videos)
+        self._next_entry_id = 0
+        self._playing = []  # entry ids, oldest first
+
+    def add_message(self, text):
+        self._append({"viewclass": "MessageRow", "text": text, "view_size": (None, MESSAGE_MIN_HEIGHT)})
+
+    def add_video(self, source, thumbnail=""):
+        self._append({
+            "viewclass": "VideoRow",
+            "source": source,
+            "thumbnail": thumbnail,
+            "playing": False,
+            "view_size": (None, VIDEO_ROW_HEIGHT),
+        })
+
+    def _append(self, entry):
+        entry["entry_id"] = self._next_entry_id
+        self._next_entry_id += 1
+        self.data.append(entry)
+        excess = len(self.data) - self.max_entries
+        if excess > 0:
+            dropped = {e["entry_id"] for e in self.data[:excess]}
+            self._playing = [entry_id for entry_id in self._playing if entry_id not in dropped]
+            del self.data[:excess]
+        Clock.schedule_once(lambda dt: setattr(self, "scroll_y", 0))
+
+    def _set_playing(self, entry_id, playing):
+        for index, entry in enumerate(self.data):
+            if entry["entry_id"] == entry_id:
+                self.data[index] = dict(entry, playing=playing)
+                return
+
+    def toggle_video(self, entry_id):
+        if entry_id in self._playing:
+            self._playing.remove(entry_id)
+            self._set_playing(entry_id, False)
+            return
+        self._playing.append(entry_id)
+        self._set_playing(entry_id, True)
+        while len(self._playing) > self.max_active_videos:
+            self._set_playing(self._playing.pop(0), False)
@@ -7,4 +7,45 @@ load_dotenv()  # Load environment variables from .env if present
 BACKEND_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:8000")
 HF_API_KEY = os.getenv("HF_API_KEY")
 # You can add other configuration values here as needed.
-PORCUPINE_KEY = os.getenv("PORCUPINE_KEY")
\ No newline at end of file
+PORCUPINE_KEY = os.getenv("PORCUPINE_KEY")
+
+# Voice-activity end-pointing for recordings (seconds)
+VAD_MIN_UTTERANCE_SECONDS = float(os.getenv("VAD_MIN_UTTERANCE_SECONDS", "1.0"))
+VAD_MAX_UTTERANCE_SECONDS = float(os.getenv("VAD_MAX_UTTERANCE_SECONDS", "10.0"))
+VAD_TRAILING_SILENCE_SECONDS = float(os.getenv("VAD_TRAILING_SILENCE_SECONDS", "0.8"))
+VAD_NO_SPEECH_TIMEOUT_SECONDS = float(os.getenv("VAD_NO_SPEECH_TIMEOUT_SECONDS", "5.0"))
+
+# Shared microphone capture: ring buffer length and pre-roll kept before each recording (seconds)
+AUDIO_RING_SECONDS = float(os.getenv("AUDIO_RING_SECONDS", "10.0"))
+AUDIO_PREROLL_SECONDS = float(os.getenv("AUDIO_PREROLL_SECONDS", "0.3"))
+
+# Stream audio to the backend over a WebSocket while recording instead of uploading a WAV afterwards
+STREAM_AUDIO_UPLOAD = os.getenv("STREAM_AUDIO_UPLOAD", "true").lower() == "true"
+
+# On-device keyframe selection for /process_frames/
+KEYFRAME_MAX_FRAMES = int(os.getenv("KEYFRAME_MAX_FRAMES", "8"))
+KEYFRAME_MIN_INTERVAL_SECONDS = float(os.getenv("KEYFRAME_MIN_INTERVAL_SECONDS", "0.5"))
+KEYFRAME_DIFF_THRESHOLD = float(os.getenv("KEYFRAME_DIFF_THRESHOLD", "12.0"))
+KEYFRAME_MAX_WIDTH = int(os.getenv("KEYFRAME_MAX_WIDTH", "640"))
+
+# Backend HTTP client timeouts (seconds)
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5.0"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "120.0"))
+
+# Number of recorded videos kept in temp_uploads for the chat history
+MAX_SAVED_VIDEOS = int(os.getenv("MAX_SAVED_VIDEOS", "20"))
+
+# Ask the backend to embed the (Opus-encoded) response audio in the JSON response
+INLINE_RESPONSE_AUDIO = os.getenv("INLINE_RESPONSE_AUDIO", "true").lower() == "true"
+
+# Chat history: entries kept in the (virtualized) list, and videos allowed to play at the same time
+CHAT_HISTORY_MAX_ENTRIES = int(os.getenv("CHAT_HISTORY_MAX_ENTRIES", "500"))
+MAX_ACTIVE_VIDEOS = int(os.getenv("MAX_ACTIVE_VIDEOS", "1"))
+
+# Worker threads for backend requests, so a new question is not queued behind a slow earlier one
+PIPELINE_UPLOAD_WORKERS = int(os.getenv("PIPELINE_UPLOAD_WORKERS", "2"))
+
+# Live-scene mode: camera frames streamed to /ws/live_scene/ (frames per second, width before JPEG encoding)
+LIVE_SCENE_FPS = float(os.getenv("LIVE_SCENE_FPS", "1.0"))
+LIVE_SCENE_MAX_WIDTH = int(os.getenv("LIVE_SCENE_MAX_WIDTH", "480"))
+LIVE_SCENE_SPEAK = os.getenv("LIVE_SCENE_SPEAK", "true").lower() == "true"
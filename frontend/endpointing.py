@@ -0,0 +1,91 @@
+import numpy as np
+
+
+class EndOfSpeechDetector:
+    """
+    Streaming end-of-speech detection on raw int16 PCM chunks.
+    Feed each chunk read from the microphone to `feed`; it returns True once recording
+    should stop, either because the user stopped talking, no speech started in time,
+    or the maximum utterance length was reached.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        min_utterance_seconds: float = 1.0,
+        max_utterance_seconds: float = 10.0,
+        trailing_silence_seconds: float = 0.8,
+        no_speech_timeout_seconds: float = 5.0,
+        energy_margin_db: float = 12.0,
+        min_energy_db: float = -50.0,
+    ):
+        self.sample_rate = sample_rate
+        self.min_utterance_seconds = min_utterance_seconds
+        self.max_utterance_seconds = max_utterance_seconds
+        self.trailing_silence_seconds = trailing_silence_seconds
+        self.no_speech_timeout_seconds = no_speech_timeout_seconds
+        self.energy_margin_db = energy_margin_db
+        self.min_energy_db = min_energy_db
+        self.reset()
+
+    def reset(self):
+        """
+        Clear all state so the detector can be reused for the next utterance.
+        """
+        self.elapsed = 0.0
+        self.speech_seconds = 0.0
+        self.trailing_silence = 0.0
+        self.speech_started = False
+        self.noise_floor_db = None
+        self.stop_reason = ""
+
+    def _energy_db(self, chunk: bytes) -> float:
+        samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float64)
+        if samples.size == 0:
+            return -120.0
+        rms = np.sqrt(np.mean(samples ** 2))
+        return 20.0 * np.log10(max(rms, 1.0) / 32768.0)
+
+    def is_speech(self, chunk: bytes) -> bool:
+        """
+        Classify one chunk as speech, adapting the noise floor estimate on non-speech chunks.
+        """
+        energy_db = self._energy_db(chunk)
+        if self.noise_floor_db is None:
+            # The first chunk seeds the noise floor; users rarely speak within the first few ms.
+            self.noise_floor_db = min(energy_db, -45.0)
+        threshold_db = max(self.noise_floor_db + self.energy_margin_db, self.min_energy_db)
+        speech = energy_db >= threshold_db
+        if not speech:
+            # Slowly track the background level so fans, traffic, etc. are not counted as speech.
+            self.noise_floor_db = 0.95 * self.noise_floor_db + 0.05 * min(energy_db, -45.0)
+        return speech
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Process one chunk and return True if recording should stop now.
+        """
+        chunk_seconds = len(chunk) / 2 / self.sample_rate
+        self.elapsed += chunk_seconds
+
+        if self.is_speech(chunk):
+            self.speech_started = True
+            self.speech_seconds += chunk_seconds
+            self.trailing_silence = 0.0
+        elif self.speech_started:
+            self.trailing_silence += chunk_seconds
+
+        if self.elapsed >= self.max_utterance_seconds:
+            self.stop_reason = "max_length"
+            return True
+        if not self.speech_started and self.elapsed >= self.no_speech_timeout_seconds:
+            self.stop_reason = "no_speech"
+            return True
+        if (
+            self.speech_started
+            and self.elapsed >= self.min_utterance_seconds
+            and self.trailing_silence >= self.trailing_silence_seconds
+        ):
+            self.stop_reason = "end_of_speech"
+            return True
+        return False
@@ -0,0 +1,79 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class KeyframeSelector:
+    """
+    Picks a small set of keyframes on-device while the camera is recording.
+    A frame becomes a keyframe when it differs enough from the previous keyframe and a minimum
+    interval has passed. The first and last frames are always kept, the total is capped at
+    'max_keyframes', and every keyframe is downscaled and JPEG-encoded for upload.
+    """
+
+    def __init__(
+        self,
+        max_keyframes: int = 8,
+        min_interval_seconds: float = 0.5,
+        diff_threshold: float = 12.0,
+        max_width: int = 640,
+        jpeg_quality: int = 80,
+    ):
+        self.max_keyframes = max(2, max_keyframes)
+        self.min_interval_seconds = min_interval_seconds
+        self.diff_threshold = diff_threshold
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.keyframes = []  # Encoded JPEG bytes
+        self._last_signature = None
+        self._last_time = None
+        self._pending_last = None  # Most recent frame not selected yet (kept to guarantee the last frame)
+
+    def _signature(self, frame):
+        # A tiny grayscale thumbnail is enough to tell whether the scene changed.
+        small = cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+    def _encode(self, frame):
+        height, width = frame.shape[:2]
+        if width > self.max_width:
+            scale = self.max_width / width
+            frame = cv2.resize(frame, (self.max_width, int(height * scale)), interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality])
+        return buffer.tobytes() if ok else None
+
+    def _select(self, frame, signature, now):
+        encoded = self._encode(frame)
+        if encoded is not None:
+            self.keyframes.append(encoded)
+            self._last_signature = signature
+            self._last_time = now
+        self._pending_last = None
+
+    def add(self, frame, now: float = None):
+        """
+        Offer one captured frame to the selector.
+        """
+        now = time.time() if now is None else now
+        signature = self._signature(frame)
+        if self._last_signature is None:
+            self._select(frame, signature, now)
+            return
+
+        # Keep the final slot free for the last frame of the recording.
+        if len(self.keyframes) < self.max_keyframes - 1 and now - self._last_time >= self.min_interval_seconds:
+            diff = float(np.mean(np.abs(signature - self._last_signature)))
+            if diff >= self.diff_threshold:
+                self._select(frame, signature, now)
+                return
+        self._pending_last = (frame, signature, now)
+
+    def finish(self) -> list:
+        """
+        Close the selection (adding the last frame if it was not already chosen) and return
+        the encoded keyframes.
+        """
+        if self._pending_last is not None:
+            self._select(*self._pending_last)
+        return self.keyframes
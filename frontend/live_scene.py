@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+
+import cv2
+import websocket  # websocket-client
+
+
+class LiveSceneStreamer:
+    """
+    Live-scene mode: streams low-rate, downscaled JPEG frames from the camera to the backend's
+    /ws/live_scene/ endpoint over one WebSocket, and hands every message the backend pushes
+    (summary updates, errors) to 'on_update' from a reader thread. The backend skips frames that
+    did not change, so a fixed low frame rate is enough here.
+    """
+
+    def __init__(self, backend_url, on_update, on_error=None, fps=1.0, max_width=480, jpeg_quality=70, speak=True, inline_audio=True):
+        ws_url = backend_url.rstrip("/").replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+        self.url = f"{ws_url}/ws/live_scene/"
+        self.on_update = on_update
+        self.on_error = on_error or (lambda error: None)
+        self.interval = 1.0 / fps if fps > 0 else 1.0
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.options = {"type": "start", "speak": speak, "inline_audio": inline_audio}
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="live-scene", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """
+        Stop streaming and release the camera. Waits up to 'timeout' seconds for the session to close.
+        """
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _encode(self, frame):
+        height, width = frame.shape[:2]
+        if width > self.max_width:
+            scale = self.max_width / width
+            frame = cv2.resize(frame, (self.max_width, int(height * scale)), interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality])
+        return buffer.tobytes() if ok else None
+
+    def _read_messages(self, ws):
+        while True:
+            try:
+                message = json.loads(ws.recv())
+            except Exception:
+                return
+            if message.get("type") == "stopped":
+                return
+            self.on_update(message)
+
+    def _run(self):
+        cap = None
+        ws = None
+        try:
+            cap = cv2.VideoCapture(0)
+            if not cap.isOpened():
+                self.on_error("Unable to access the camera.")
+                return
+            ws = websocket.create_connection(self.url, timeout=10)
+            ws.settimeout(None)
+            ws.send(json.dumps(self.options))
+            reader = threading.Thread(target=self._read_messages, args=(ws,), name="live-scene-reader", daemon=True)
+            reader.start()
+
+            next_send = 0.0
+            while not self._stop.is_set() and reader.is_alive():
+                # Keep grabbing so the frame sent is the current one, not one buffered by the driver.
+                if not cap.grab():
+                    self.on_error("Camera stopped delivering frames.")
+                    break
+                now = time.time()
+                if now < next_send:
+                    continue
+                next_send = now + self.interval
+                ret, frame = cap.retrieve()
+                encoded = self._encode(frame) if ret else None
+                if encoded is not None:
+                    ws.send_binary(encoded)
+
+            # Free the camera first, so a recording can take it over while the session winds down.
+            cap.release()
+            cap = None
+            if reader.is_alive():
+                ws.send(json.dumps({"type": "stop"}))
+                reader.join(5.0)
+            elif not self._stop.is_set():
+                self.on_error("The live scene connection was closed.")
+        except Exception as e:
+            self.on_error(e)
+        finally:
+            if cap is not None:
+                cap.release()
+            if ws is not None:
+                try:
+                    ws.close()
+                except Exception:
+                    pass
@@ -3,8 +3,8 @@ import uuid
 import threading
 import time
 import json
-import requests
 import wave
+import websocket  # websocket-client, for streaming audio while recording
 import cv2  # OpenCV for video recording
 
 import numpy as np
@@ -12,28 +12,47 @@ from kivy.clock import Clock
 from kivy.app import App
 from kivy.lang import Builder
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.label import Label
-from kivy.uix.video import Video   # To display video in the UI
-from kivy.core.audio import SoundLoader
 
-import pyaudio
 import pvporcupine
 
-from config import BACKEND_URL, PORCUPINE_KEY
+from config import (
+    BACKEND_URL,
+    PORCUPINE_KEY,
+    VAD_MIN_UTTERANCE_SECONDS,
+    VAD_MAX_UTTERANCE_SECONDS,
+    VAD_TRAILING_SILENCE_SECONDS,
+    VAD_NO_SPEECH_TIMEOUT_SECONDS,
+    AUDIO_PREROLL_SECONDS,
+    AUDIO_RING_SECONDS,
+    STREAM_AUDIO_UPLOAD,
+    KEYFRAME_MAX_FRAMES,
+    KEYFRAME_MIN_INTERVAL_SECONDS,
+    KEYFRAME_DIFF_THRESHOLD,
+    KEYFRAME_MAX_WIDTH,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    MAX_SAVED_VIDEOS,
+    INLINE_RESPONSE_AUDIO,
+    PIPELINE_UPLOAD_WORKERS,
+    LIVE_SCENE_FPS,
+    LIVE_SCENE_MAX_WIDTH,
+    LIVE_SCENE_SPEAK,
+)
+from endpointing import EndOfSpeechDetector
+from audio_capture import AudioCapture
+from keyframes import KeyframeSelector
+from network import BackendClient, InteractionCancelled
+from playback import StreamingAudioPlayer
+from chat_history import ChatHistory  # Registers the ChatHistory widget used in KV
+from pipeline import InteractionPipeline
+from live_scene import LiveSceneStreamer
 
 # KV string for a simple chat UI layout
 KV = '''
 <ChatScreen>:
     orientation: 'vertical'
-    ScrollView:
-        id: scroll_view
-        do_scroll_x: True
-        do_scroll_y: True
-        BoxLayout:
-            id: chat_box
-            orientation: 'vertical'
-            size_hint_y: None
-            height: self.minimum_height
+    ChatHistory:
+        id: chat_history
     Label:
         id: mic_indicator
         text: ''
@@ -49,103 +68,240 @@ class ChatScreen(BoxLayout):
 class MyKivyApp(App):
     def build(self):
         self.chat_screen = ChatScreen()
+        self.backend = BackendClient(BACKEND_URL, connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT)
+        self.player = StreamingAudioPlayer(self.backend)
+        # Capture, upload and playback run on their own workers; the wake word listener only hands work off.
+        self.pipeline = InteractionPipeline(self.backend, upload_workers=PIPELINE_UPLOAD_WORKERS, on_error=self.report_stage_error)
+        self.live_scene = LiveSceneStreamer(
+            BACKEND_URL,
+            on_update=self.on_live_scene_update,
+            on_error=lambda err: Clock.schedule_once(lambda dt: self.add_message(f"Live mode error: {err}", sender="error")),
+            fps=LIVE_SCENE_FPS,
+            max_width=LIVE_SCENE_MAX_WIDTH,
+            speak=LIVE_SCENE_SPEAK,
+            inline_audio=INLINE_RESPONSE_AUDIO,
+        )
+        self.prune_temp_uploads(keep_videos=0)  # Leftovers from previous sessions are not shown in the chat.
         threading.Thread(target=self.wake_word_listener, daemon=True).start()
         return self.chat_screen
 
+    def on_stop(self):
+        self.live_scene.stop()
+
+    def prune_temp_uploads(self, keep_videos=MAX_SAVED_VIDEOS):
+        """
+        Deletes leftover recordings from temp_uploads, keeping only the newest 'keep_videos' videos
+        (and their thumbnails).
+        """
+        temp_dir = "temp_uploads"
+        if not os.path.exists(temp_dir):
+            return
+        paths = [os.path.join(temp_dir, name) for name in os.listdir(temp_dir)]
+        videos = sorted((p for p in paths if p.endswith(".mp4")), key=os.path.getmtime, reverse=True)
+        kept_thumbnails = {self.thumbnail_path(p) for p in videos[:keep_videos]}
+        thumbnails = [p for p in paths if p.endswith("_thumb.jpg") and p not in kept_thumbnails]
+        stale = [p for p in paths if p.endswith(".wav")] + videos[keep_videos:] + thumbnails
+        for path in stale:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def thumbnail_path(video_filepath):
+        return os.path.splitext(video_filepath)[0] + "_thumb.jpg"
+
     def add_message(self, message, sender="system"):
-        lbl = Label(text=f"[{sender}] {message}", markup=True, size_hint_y=None, height='30dp')
-        self.chat_screen.ids.chat_box.add_widget(lbl)
-        Clock.schedule_once(lambda dt: setattr(self.chat_screen.ids.scroll_view, 'scroll_y', 0))
+        self.chat_screen.ids.chat_history.add_message(f"[{sender}] {message}")
+
+    def report_stage_error(self, stage, error):
+        Clock.schedule_once(lambda dt: self.add_message(f"Error in {stage}: {error}", sender="error"))
 
     def wake_word_listener(self):
         """
-        Listens for the wake word "Jarvis" using Porcupine and starts recording audio when detected.   
+        Listens for the wake word "Jarvis" using Porcupine and starts recording audio when detected.
+        A single long-lived AudioCapture feeds both the wake word detector and the recorder,
+        so the microphone is never reopened and no audio is lost between them.
+        Recording and everything after it run on the pipeline stages, so this thread never stops
+        listening: a new wake word interrupts whatever the previous interaction is still doing.
         """
         try:
             porcupine = pvporcupine.create(access_key=PORCUPINE_KEY, keywords=["jarvis"])
-            pa = pyaudio.PyAudio()
-            audio_stream = pa.open(
-                rate=porcupine.sample_rate,
-                channels=1,
-                format=pyaudio.paInt16,
-                input=True,
-                frames_per_buffer=porcupine.frame_length
+            self.audio_capture = AudioCapture(
+                sample_rate=porcupine.sample_rate,
+                frame_length=porcupine.frame_length,
+                capacity_seconds=AUDIO_RING_SECONDS,
             )
+            self.audio_capture.start()
+            wake_reader = self.audio_capture.reader()
             
             Clock.schedule_once(lambda dt: self.add_message("Hi there! Just say 'Jarvis' to get started.", sender="app"))
 
             while True:
-                pcm = audio_stream.read(porcupine.frame_length)
+                try:
+                    pcm = wake_reader.read()
+                except TimeoutError:
+                    # The microphone stalled briefly (e.g. a device hiccup); keep listening.
+                    continue
                 pcm = np.frombuffer(pcm, dtype=np.int16)
                 result = porcupine.process(pcm)
                 if result >= 0:
+                    # A new wake word supersedes whatever the previous interaction was still doing.
+                    token = self.pipeline.new_interaction()
+                    self.player.stop()
                     Clock.schedule_once(lambda dt: self.add_message("Hello! This is Jarvis. How can I make your day easier", sender="Jarvis"))
-                    self.record_audio()
-                time.sleep(0.01)
+                    # Start the recording right after the frame that contained the wake word.
+                    self.pipeline.capture.submit(token, self.record_audio, token, wake_reader.cursor)
         except Exception as e:
             Clock.schedule_once(lambda dt, err=e: self.add_message(f"Error in calling up 'Jarvis': {err}", sender="error"))
 
-    def record_audio(self):
+    def record_audio(self, token, start_index=None):
         """
-        Records audio from the microphone (simulated for 5 seconds) and sends it to the backend.
+        Records audio from the shared microphone capture until the user stops talking and sends it
+        to the backend. Recording starts at 'start_index' (the frame right after the wake word) when
+        given; otherwise it starts with a short pre-roll so the first words are not cut. It stops after a trailing-silence timeout once speech has started, when no
+        speech starts in time, or when the maximum utterance length is reached.
+        When STREAM_AUDIO_UPLOAD is enabled, chunks are streamed to the backend over a WebSocket
+        while they are captured; the WAV file upload is only used as a fallback.
+        Runs on the capture stage and stops early when a new wake word supersedes 'token'; the
+        upload is handed to the upload stage.
         """
-        CHUNK = 1024
-        FORMAT = pyaudio.paInt16
-        CHANNELS = 1
-        RATE = 16000
-        
-        pa = pyaudio.PyAudio()
-        stream = pa.open(format=FORMAT, channels=CHANNELS, rate=RATE, input=True, frames_per_buffer=CHUNK)
+        capture = self.audio_capture
+        # With an exact start there is no gap to cover, and a pre-roll would rewind into the wake word
+        # itself, which the detector would take as the start of speech.
+        preroll_seconds = AUDIO_PREROLL_SECONDS if start_index is None else 0.0
+        reader = capture.reader(preroll_seconds=preroll_seconds, start_index=start_index)
         frames = []
-        Clock.schedule_once(lambda dt: self.add_message("You've got my attention. I'm listening for the next 5 seconds.", sender="Jarvis"))
-        record_seconds = 5
-        for i in range(0, int(RATE / CHUNK * record_seconds)):
-            data = stream.read(CHUNK)
+        Clock.schedule_once(lambda dt: self.add_message("You've got my attention. I'm listening.", sender="Jarvis"))
+        detector = EndOfSpeechDetector(
+            sample_rate=capture.sample_rate,
+            min_utterance_seconds=VAD_MIN_UTTERANCE_SECONDS,
+            max_utterance_seconds=VAD_MAX_UTTERANCE_SECONDS,
+            trailing_silence_seconds=VAD_TRAILING_SILENCE_SECONDS,
+            no_speech_timeout_seconds=VAD_NO_SPEECH_TIMEOUT_SECONDS,
+        )
+        audio_stream = self.open_audio_stream(capture.sample_rate) if STREAM_AUDIO_UPLOAD else None
+        if audio_stream is not None:
+            # Closing the socket also releases an upload worker blocked waiting for the reply.
+            self.pipeline.on_cancel(token, lambda: self.close_audio_stream(audio_stream))
+        while True:
+            if not self.backend.is_current(token):
+                if audio_stream is not None:
+                    self.close_audio_stream(audio_stream, cancel=True)
+                return
+            try:
+                data = reader.read()
+            except TimeoutError:
+                continue
             frames.append(data)
-        stream.stop_stream()
-        stream.close()
-        pa.terminate()
+            if audio_stream is not None:
+                try:
+                    audio_stream.send_binary(data)
+                except Exception:
+                    # Streaming broke mid-utterance; fall back to uploading the whole recording.
+                    self.close_audio_stream(audio_stream)
+                    audio_stream = None
+            if detector.feed(data):
+                break
+
+        if detector.stop_reason == "no_speech":
+            if audio_stream is not None:
+                self.close_audio_stream(audio_stream, cancel=True)
+            Clock.schedule_once(lambda dt: self.add_message("I didn't hear anything. Just say 'Jarvis' to try again.", sender="Jarvis"))
+            return
+
+        if audio_stream is not None:
+            self.pipeline.upload.submit(token, self.finish_audio_stream, audio_stream, token)
+            return
         
         temp_dir = "temp_uploads"
         if not os.path.exists(temp_dir):
             os.makedirs(temp_dir)
         filename = os.path.join(temp_dir, f"{uuid.uuid4()}_input.wav")
         wf = wave.open(filename, 'wb')
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(pa.get_sample_size(FORMAT))
-        wf.setframerate(RATE)
+        wf.setnchannels(1)
+        wf.setsampwidth(capture.sample_width)
+        wf.setframerate(capture.sample_rate)
         wf.writeframes(b''.join(frames))
         wf.close()
         
         #Clock.schedule_once(lambda dt: self.add_message("Recording complete. Sending audio to backend...", sender="app"))
         #Clock.schedule_once(lambda dt: self.add_message("Hang tight, I'm processing that for you!", sender="app"))
-        self.send_audio_to_backend(filename)
+        self.pipeline.upload.submit(token, self.send_audio_to_backend, filename, token)
     
-    def send_audio_to_backend(self, audio_filepath):
+    def open_audio_stream(self, sample_rate):
+        """
+        Opens a WebSocket to the /ws/process_audio/ endpoint and announces the audio format.
+        Returns None if the connection cannot be established.
+        """
+        try:
+            ws_url = BACKEND_URL.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+            audio_stream = websocket.create_connection(f"{ws_url}/ws/process_audio/", timeout=10)
+            audio_stream.send(json.dumps({"type": "start", "sample_rate": sample_rate, "inline_audio": INLINE_RESPONSE_AUDIO}))
+            return audio_stream
+        except Exception:
+            return None
+
+    def close_audio_stream(self, audio_stream, cancel=False):
+        try:
+            if cancel:
+                audio_stream.send(json.dumps({"type": "cancel"}))
+            audio_stream.close()
+        except Exception:
+            pass
+
+    def finish_audio_stream(self, audio_stream, token):
+        """
+        Signals end of speech on the audio WebSocket and waits for the processed response.
+        """
+        try:
+            audio_stream.send(json.dumps({"type": "end"}))
+            # The backend runs STT, intent recognition, the LLM and TTS before replying.
+            audio_stream.settimeout(120)
+            data = json.loads(audio_stream.recv())
+            if not self.backend.is_current(token):
+                return
+            if data.get("error"):
+                Clock.schedule_once(lambda dt, err=data["error"]: self.add_message(f"Backend error: {err}", sender="error"))
+            else:
+                self.process_audio_response(data, token)
+        except Exception as e:
+            Clock.schedule_once(lambda dt, err=e: self.add_message(f"Error sending audio: {err}", sender="error"))
+        finally:
+            self.close_audio_stream(audio_stream)
+
+    def send_audio_to_backend(self, audio_filepath, token):
         """
         Posts the recorded audio file to the /process_audio/ endpoint.
         """
         try:
-            files = {'file': open(audio_filepath, 'rb')}
-            url = f"{BACKEND_URL}/process_audio/"
-            response = requests.post(url, files=files)
+            params = {"inline_audio": str(INLINE_RESPONSE_AUDIO).lower()}
+            response = self.backend.post_file("/process_audio/", audio_filepath, token, params=params)
             if response.status_code == 200:
                 data = response.json()
-                self.process_audio_response(data)
+                self.process_audio_response(data, token)
             else:
                 Clock.schedule_once(lambda dt, err=response.status_code: self.add_message(f"Backend error: {err}", sender="error"))
+        except InteractionCancelled:
+            pass
         except Exception as e:
             Clock.schedule_once(lambda dt, err=e: self.add_message(f"Error sending audio: {err}", sender="error"))
+        finally:
+            # The recording is only needed for the upload.
+            try:
+                os.remove(audio_filepath)
+            except OSError:
+                pass
     
-    def process_audio_response(self, data):
+    def process_audio_response(self, data, token):
         """
-        Processes the JSON response from the audio API.
+        Processes the JSON response from the audio API: video capture goes to the capture stage,
+        the spoken answer to the playback stage.
         """
         data1 = data.get("data1", {})
         data2 = data.get("data2", "")
         data3 = data.get("data3", "")  # Relative URL (e.g., "/download_audio/filename.mp3")
         
-        audio_url = f"{BACKEND_URL}{data3}"
         transcript = data.get("transcript", "")
         
         Clock.schedule_once(lambda dt: self.add_message(f": {transcript}", sender="user"))
@@ -155,35 +311,57 @@ class MyKivyApp(App):
         if data1.get("Record"):
             #Clock.schedule_once(lambda dt: self.add_message("Record intent detected. Launching video capture...", sender="app"))
             Clock.schedule_once(lambda dt: self.add_message("Got it! You’d like to start recording—camera’s coming on. ", sender="Jarvis"))
-            self.capture_video()  # Launch video capture
+            self.pipeline.capture.submit(token, self.capture_video, token)  # Launch video capture
+        elif data1.get("Live"):
+            self.pipeline.capture.submit(token, self.set_live_scene, data1["Live"] != "stop")
         else:
             #Clock.schedule_once(lambda dt: self.add_message("Playing response audio...", sender="app"))
             Clock.schedule_once(lambda dt: self.add_message("Umm... here's what I know!", sender="Jarvis"))
-            self.play_audio(audio_url)
+            self.pipeline.playback.submit(token, self.play_response_audio, data, data3, token)
             Clock.schedule_once(lambda dt: self.add_message(f": {data2}", sender="Jarvis"))
-            #self.play_audio(audio_url)
+            #self.play_response_audio(data, data3, token)
         
         #Clock.schedule_once(lambda dt: self.add_message("Re-listening for wake word...", sender="app"))
         Clock.schedule_once(lambda dt: self.add_message("Just say 'Jarvis' if you need my help again!", sender="app"))
     
-    def play_audio(self, audio_url):
+    def play_audio(self, audio_path, token):
+        """
+        Streams and plays the response audio while it downloads. Playback stops when a new
+        wake word starts another interaction.
+        """
+        self.player.play(
+            audio_path,
+            token,
+            on_error=lambda err: Clock.schedule_once(lambda dt: self.add_message(f"Failed to load audio: {err}", sender="error")),
+        )
+    
+    def play_response_audio(self, data, audio_path, token):
         """
-        Loads and plays the audio using Kivy's SoundLoader.
+        Plays the audio embedded in a backend response, or streams it from 'audio_path' otherwise.
         """
-        sound = SoundLoader.load(audio_url)
-        if sound:
-            sound.play()
+        if data.get("audio_base64"):
+            self.player.play_inline(
+                data["audio_base64"],
+                data.get("audio_mime", ""),
+                token,
+                on_error=lambda err: Clock.schedule_once(lambda dt: self.add_message(f"Failed to load audio: {err}", sender="error")),
+            )
         else:
-            Clock.schedule_once(lambda dt: self.add_message("Failed to load audio.", sender="error"))
+            self.play_audio(audio_path, token)
     
-    def capture_video(self):
+    def capture_video(self, token):
         """
-        Captures video for 5 seconds using the webcam (via OpenCV), sends it to the backend,
-        and updates the chat UI with the video summary and plays the TTS audio.
-        The recorded video is displayed in the UI using a Kivy Video widget.
+        Captures video for 5 seconds using the webcam (via OpenCV) and selects and downscales keyframes
+        on-device. Runs on the capture stage and stops early if a new wake word supersedes 'token';
+        the keyframes are handed to the upload stage (see upload_keyframes).
+        The recorded video is kept locally and added to the chat history (as a thumbnail until tapped).
         """
         # Start video capture using OpenCV
         try:
+            if self.live_scene.running:
+                # Both need the camera; the recording takes over from live mode.
+                self.live_scene.stop()
+                Clock.schedule_once(lambda dt: self.add_message("Live mode is off while I record.", sender="Jarvis"))
             cap = cv2.VideoCapture(0)
             if not cap.isOpened():
                 Clock.schedule_once(lambda dt: self.add_message("Error: Unable to access the camera.", sender="error"))
@@ -200,49 +378,112 @@ class MyKivyApp(App):
             frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             out = cv2.VideoWriter(video_filename, fourcc, fps, (frame_width, frame_height))
             
+            keyframe_selector = KeyframeSelector(
+                max_keyframes=KEYFRAME_MAX_FRAMES,
+                min_interval_seconds=KEYFRAME_MIN_INTERVAL_SECONDS,
+                diff_threshold=KEYFRAME_DIFF_THRESHOLD,
+                max_width=KEYFRAME_MAX_WIDTH,
+            )
+            
             Clock.schedule_once(lambda dt: self.add_message("Recording video for 5 seconds...", sender="Jarvis"))
             start_time = time.time()
-            while time.time() - start_time < 5:
+            while time.time() - start_time < 5 and self.backend.is_current(token):
                 ret, frame = cap.read()
                 if ret:
                     out.write(frame)
+                    keyframe_selector.add(frame)
                 else:
                     break
             cap.release()
             out.release()
+            if not self.backend.is_current(token):
+                os.remove(video_filename)
+                return
             
             #Clock.schedule_once(lambda dt: self.add_message("Video recorded. Sending video to backend...", sender="app"))
             Clock.schedule_once(lambda dt: self.add_message("Just a moment... I’m processing what’s around you.", sender="Jarvis"))
             
-            # Send the video file to process_video API
-            files = {'file': open(video_filename, 'rb')}
-            url = f"{BACKEND_URL}/process_video/"
-            response = requests.post(url, files=files)
+            # Send only the selected keyframes to the process_frames API
+            keyframes = keyframe_selector.finish()
+            # The first keyframe doubles as the chat thumbnail, so the video is not decoded until tapped.
+            thumbnail_filename = self.thumbnail_path(video_filename)
+            if keyframes:
+                with open(thumbnail_filename, "wb") as f:
+                    f.write(keyframes[0])
+            self.pipeline.upload.submit(token, self.upload_keyframes, keyframes, video_filename, thumbnail_filename, token)
+        except Exception as e:
+            Clock.schedule_once(lambda dt, err=e: self.add_message(f"Error during video capture: {err}", sender="error"))
+
+    def set_live_scene(self, enabled):
+        """
+        Starts or stops live-scene mode, as the user asked. While it runs, camera frames are streamed
+        to the backend and its summary updates are shown (and spoken) as they arrive.
+        Live mode is independent of interactions, so wake words and questions keep working meanwhile.
+        """
+        if not enabled:
+            if self.live_scene.running:
+                self.live_scene.stop()
+                Clock.schedule_once(lambda dt: self.add_message("Live mode is off.", sender="Jarvis"))
+            else:
+                Clock.schedule_once(lambda dt: self.add_message("Live mode is already off.", sender="Jarvis"))
+        elif self.live_scene.running:
+            Clock.schedule_once(lambda dt: self.add_message("Live mode is already on.", sender="Jarvis"))
+        else:
+            self.live_scene.start()
+            Clock.schedule_once(lambda dt: self.add_message("Live mode is on. I'll tell you when your surroundings change.", sender="Jarvis"))
+
+    def on_live_scene_update(self, data):
+        """
+        Handles a message pushed by the live-scene stream: shows what changed (the whole summary for the
+        first update) and plays its audio as part of the current interaction, so a wake word interrupts it.
+        """
+        if data.get("type") == "error":
+            Clock.schedule_once(lambda dt, err=data.get("error"): self.add_message(f"Live mode error: {err}", sender="error"))
+            return
+        if data.get("type") != "summary":
+            return
+        text = data.get("change") if data.get("update", 1) > 1 else data.get("text_summary")
+        if not text:
+            return
+        Clock.schedule_once(lambda dt: self.add_message(f"Live: {text}", sender="Jarvis"))
+        if data.get("audio_file") or data.get("audio_base64"):
+            token = self.backend.current_token()
+            self.pipeline.playback.submit(token, self.play_response_audio, data, data.get("audio_file", ""), token)
+
+    def upload_keyframes(self, keyframes, video_filename, thumbnail_filename, token):
+        """
+        Sends the keyframes of a recording to /process_frames/, then updates the chat UI with the
+        video summary and hands the TTS audio to the playback stage.
+        """
+        try:
+            files = [('files', (f"frame_{idx}.jpg", jpeg, 'image/jpeg')) for idx, jpeg in enumerate(keyframes)]
+            params = {"inline_audio": str(INLINE_RESPONSE_AUDIO).lower()}
+            response = self.backend.post("/process_frames/", token, files=files, params=params)
             if response.status_code == 200:
                 video_data = response.json()
                 text_summary = video_data.get("text_summary", "")
                 video_audio_relative = video_data.get("audio_file", "")
-                full_audio_url = f"{BACKEND_URL}{video_audio_relative}"
                 # Display video summary in UI
                 #Clock.schedule_once(lambda dt: self.add_message(f"Video summary: {text_summary}", sender="assistant"))
                 Clock.schedule_once(lambda dt: self.add_message(f"Based on what I see, here's my take on what's around you: {text_summary}", sender="Jarvis"))
                 # Play the video TTS audio
-                self.play_audio(full_audio_url)
-                # Display the recorded video in the chat UI using a Video widget
-                Clock.schedule_once(lambda dt: self.add_video(video_filename))
+                self.pipeline.playback.submit(token, self.play_response_audio, video_data, video_audio_relative, token)
+                # Add the recorded video to the chat history (thumbnail until tapped)
+                Clock.schedule_once(lambda dt: self.add_video(video_filename, thumbnail_filename))
+                self.prune_temp_uploads()
             else:
                 Clock.schedule_once(lambda dt, err=response.status_code: self.add_message(f"Error from video API: {err}", sender="error"))
+        except InteractionCancelled:
+            pass
         except Exception as e:
-            Clock.schedule_once(lambda dt, err=e: self.add_message(f"Error during video capture: {err}", sender="error"))
+            Clock.schedule_once(lambda dt, err=e: self.add_message(f"Error sending video: {err}", sender="error"))
     
-    def add_video(self, video_filepath):
+    def add_video(self, video_filepath, thumbnail_filepath=""):
         """
-        Adds a Video widget to the chat UI to display the recorded video.
-        The video will remain in the UI until the user closes the app.
+        Adds the recorded video to the chat history. It is shown as a thumbnail and only decoded
+        while the user has tapped it to play; the number of playing videos is capped.
         """
-        from kivy.uix.video import Video
-        video_widget = Video(source=video_filepath, state='play', options={'eos': 'loop'}, size_hint_y=None, height='200dp')
-        self.chat_screen.ids.chat_box.add_widget(video_widget)
+        self.chat_screen.ids.chat_history.add_video(video_filepath, thumbnail_filepath)
         Clock.schedule_once(lambda dt: self.add_message("Saving your video in our chat", sender="app"))
     
 if __name__ == "__main__":
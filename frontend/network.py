@@ -0,0 +1,131 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class InteractionCancelled(Exception):
+    """
+    Raised when a request belongs to an interaction that was superseded by a newer wake word.
+    """
+
+
+class BackendClient:
+    """
+    Networking layer for the Kivy app.
+    All requests share one keep-alive session (so TCP/TLS setup is paid once), use explicit
+    connect/read timeouts, and are tagged with an interaction token. Starting a new interaction
+    closes any in-flight streamed responses of the previous one, releases callers waiting on its
+    POSTs and makes its results stale.
+    """
+
+    def __init__(self, base_url: str, connect_timeout: float = 5.0, read_timeout: float = 120.0, pool_size: int = 4):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._open_responses = {}  # token -> set of streamed responses still being read
+        self._pending_posts = {}   # token -> set of events waking callers of in-flight POSTs
+
+    def url(self, path: str) -> str:
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}{path}"
+
+    def new_interaction(self) -> int:
+        """
+        Start a new interaction and cancel everything belonging to earlier ones.
+        Returns the token to pass to subsequent requests.
+        """
+        with self._lock:
+            self._generation += 1
+            stale = [response for token, responses in self._open_responses.items() for response in responses]
+            self._open_responses = {}
+            waiting = [event for token, events in self._pending_posts.items() for event in events]
+            self._pending_posts = {}
+            token = self._generation
+        for event in waiting:
+            event.set()
+        for response in stale:
+            try:
+                response.close()
+            except Exception:
+                pass
+        return token
+
+    def current_token(self) -> int:
+        """
+        Token of the latest interaction, for work not started by a wake word (e.g. live-scene updates).
+        """
+        return self._generation
+
+    def is_current(self, token: int) -> bool:
+        return token == self._generation
+
+    def check(self, token: int):
+        if not self.is_current(token):
+            raise InteractionCancelled()
+
+    def post(self, path: str, token: int, **kwargs) -> requests.Response:
+        """
+        POST to the backend. Raises InteractionCancelled as soon as the interaction is superseded,
+        even while the request is in flight: the request itself cannot be interrupted, so it runs on
+        a helper thread that is abandoned (its response closed once it arrives) and the caller,
+        e.g. an upload worker, is released straight away.
+        """
+        self.check(token)
+        wake = threading.Event()
+        outcome = {}
+
+        def send():
+            try:
+                outcome["response"] = self.session.post(self.url(path), timeout=self.timeout, **kwargs)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                with self._lock:
+                    self._pending_posts.get(token, set()).discard(wake)
+                    abandoned = not self.is_current(token)
+                wake.set()
+                if abandoned and "response" in outcome:
+                    outcome["response"].close()
+
+        with self._lock:
+            self._pending_posts.setdefault(token, set()).add(wake)
+        threading.Thread(target=send, name="backend-post", daemon=True).start()
+        wake.wait()
+        self.check(token)
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["response"]
+
+    def post_file(self, path: str, file_path: str, token: int, field: str = "file", **kwargs) -> requests.Response:
+        """
+        Upload a local file, making sure the file handle is closed afterwards.
+        """
+        with open(file_path, "rb") as f:
+            return self.post(path, token, files={field: f}, **kwargs)
+
+    def iter_content(self, path: str, token: int, chunk_size: int = 8192):
+        """
+        Stream a response body chunk by chunk. The download stops as soon as the interaction
+        is cancelled.
+        """
+        self.check(token)
+        response = self.session.get(self.url(path), stream=True, timeout=self.timeout)
+        with self._lock:
+            self._open_responses.setdefault(token, set()).add(response)
+        try:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                self.check(token)
+                if chunk:
+                    yield chunk
+        finally:
+            with self._lock:
+                self._open_responses.get(token, set()).discard(response)
+            response.close()
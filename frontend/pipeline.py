@@ -0,0 +1,92 @@
+import queue
+import threading
+
+from network import InteractionCancelled
+
+
+class Stage:
+    """
+    One stage of the client pipeline: a bounded queue of jobs served by worker threads.
+    Jobs are (token, func, args); func is called as func(*args). Jobs whose interaction
+    has been superseded are dropped instead of run, and when the queue is full the oldest
+    pending job makes room for the new one.
+    """
+
+    def __init__(self, name, backend, workers=1, max_pending=2, on_error=None):
+        self.name = name
+        self.backend = backend
+        self.on_error = on_error
+        self.queue = queue.Queue(maxsize=max(1, max_pending))
+        self.threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True) for i in range(max(1, workers))
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, token, func, *args):
+        item = (token, func, args)
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        while True:
+            token, func, args = self.queue.get()
+            if not self.backend.is_current(token):
+                continue
+            try:
+                func(*args)
+            except InteractionCancelled:
+                pass
+            except Exception as e:
+                if self.on_error is not None and self.backend.is_current(token):
+                    self.on_error(self.name, e)
+
+
+class InteractionPipeline:
+    """
+    Staged client pipeline: capture (microphone / camera) -> upload (backend requests) -> playback.
+    Each stage runs on its own worker threads behind a bounded queue, so the wake word listener
+    only hands work off and keeps listening. Starting a new interaction makes every queued or
+    running job of older interactions stale and runs their cancel callbacks (e.g. closing an
+    audio WebSocket) so blocked workers are released straight away.
+    """
+
+    def __init__(self, backend, upload_workers=2, on_error=None):
+        self.backend = backend
+        self.capture = Stage("capture", backend, workers=1, max_pending=2, on_error=on_error)
+        self.upload = Stage("upload", backend, workers=upload_workers, max_pending=4, on_error=on_error)
+        self.playback = Stage("playback", backend, workers=1, max_pending=2, on_error=on_error)
+        self._lock = threading.Lock()
+        self._cancel_callbacks = {}  # token -> list of callables
+
+    def new_interaction(self):
+        """
+        Supersede everything in flight and return the token of the new interaction.
+        """
+        token = self.backend.new_interaction()
+        with self._lock:
+            stale = [callback for old, callbacks in self._cancel_callbacks.items() if old != token for callback in callbacks]
+            self._cancel_callbacks = {}
+        for callback in stale:
+            try:
+                callback()
+            except Exception:
+                pass
+        return token
+
+    def on_cancel(self, token, callback):
+        """
+        Run 'callback' when the interaction 'token' is superseded (immediately if it already is).
+        """
+        with self._lock:
+            if self.backend.is_current(token):
+                self._cancel_callbacks.setdefault(token, []).append(callback)
+                return
+        callback()
@@ -0,0 +1,163 @@
+import os
+import base64
+import struct
+import tempfile
+import threading
+
+import pyaudio
+from kivy.core.audio import SoundLoader
+
+from network import InteractionCancelled
+
+# File extensions for audio embedded in backend responses, so SoundLoader picks the right decoder.
+MIME_EXTENSIONS = {"audio/ogg": ".ogg", "audio/mpeg": ".mp3", "audio/flac": ".flac", "audio/wav": ".wav"}
+
+
+class StreamingAudioPlayer:
+    """
+    Plays response audio while it is still downloading.
+    WAV responses (what pyttsx3 produces) are decoded on the fly and written to a PyAudio
+    output stream chunk by chunk. Other formats are downloaded to a temporary file and handed
+    to Kivy's SoundLoader. Playback runs on its own thread and stops when the interaction it
+    belongs to is cancelled.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._pa = None
+        self._sound = None
+
+    def play(self, path: str, token: int, on_error=None):
+        """
+        Start playing the audio at 'path' (relative backend URL or absolute URL) in the background.
+        """
+        thread = threading.Thread(target=self._play, args=(path, token, on_error), daemon=True)
+        thread.start()
+        return thread
+
+    def play_inline(self, audio_base64: str, audio_mime: str, token: int, on_error=None):
+        """
+        Play audio that was embedded in a backend response (no second round trip).
+        """
+        thread = threading.Thread(target=self._play_inline, args=(audio_base64, audio_mime, token, on_error), daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        """
+        Stop any non-streamed sound that is currently playing.
+        Streamed playback stops by itself once its interaction is cancelled.
+        """
+        if self._sound is not None:
+            try:
+                self._sound.stop()
+            except Exception:
+                pass
+            self._sound = None
+
+    def _play(self, path, token, on_error):
+        try:
+            chunks = self.backend.iter_content(path, token)
+            buffer = b""
+            for chunk in chunks:
+                buffer += chunk
+                if len(buffer) >= 12:
+                    break
+            if buffer[:4] == b"RIFF" and buffer[8:12] == b"WAVE":
+                self._play_wav_stream(buffer, chunks, token)
+            elif buffer:
+                self._play_file(buffer, chunks, path, token)
+        except InteractionCancelled:
+            pass
+        except Exception as e:
+            # Errors after cancellation are expected (the download was closed underneath us).
+            if self.backend.is_current(token) and on_error is not None:
+                on_error(e)
+
+    def _play_inline(self, audio_base64, audio_mime, token, on_error):
+        try:
+            data = base64.b64decode(audio_base64)
+            if not data:
+                return
+            if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+                self._play_wav_stream(data, iter(()), token)
+            else:
+                self._play_file(data, iter(()), f"response{MIME_EXTENSIONS.get(audio_mime, '.audio')}", token)
+        except InteractionCancelled:
+            pass
+        except Exception as e:
+            if self.backend.is_current(token) and on_error is not None:
+                on_error(e)
+
+    def _play_wav_stream(self, buffer, chunks, token):
+        def read_exact(size):
+            nonlocal buffer
+            while len(buffer) < size:
+                try:
+                    buffer += next(chunks)
+                except StopIteration:
+                    raise ValueError("truncated WAV header") from None
+            data, buffer = buffer[:size], buffer[size:]
+            return data
+
+        read_exact(12)  # RIFF header
+        channels, sample_rate, bits = 1, 22050, 16
+        while True:
+            chunk_id, chunk_size = struct.unpack("<4sI", read_exact(8))
+            if chunk_id == b"fmt ":
+                fmt = read_exact(chunk_size + (chunk_size & 1))
+                _, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+            elif chunk_id == b"data":
+                break
+            else:
+                read_exact(chunk_size + (chunk_size & 1))
+
+        if self._pa is None:
+            self._pa = pyaudio.PyAudio()
+        stream = self._pa.open(
+            format=self._pa.get_format_from_width(bits // 8),
+            channels=channels,
+            rate=sample_rate,
+            output=True,
+        )
+        frame_size = channels * bits // 8
+        try:
+            # The data chunk size is ignored: some TTS engines write a placeholder while streaming.
+            pending = buffer
+            for chunk in chunks:
+                self.backend.check(token)
+                pending += chunk
+                playable = len(pending) - len(pending) % frame_size
+                if playable:
+                    stream.write(pending[:playable])
+                    pending = pending[playable:]
+            # Audio left after the header (all of it for inline WAVs, which have no further chunks).
+            self.backend.check(token)
+            playable = len(pending) - len(pending) % frame_size
+            if playable:
+                stream.write(pending[:playable])
+        finally:
+            stream.stop_stream()
+            stream.close()
+
+    def _play_file(self, buffer, chunks, path, token):
+        extension = os.path.splitext(path)[1] or ".audio"
+        with tempfile.NamedTemporaryFile(suffix=extension, delete=False) as tmp:
+            tmp.write(buffer)
+            for chunk in chunks:
+                tmp.write(chunk)
+            temp_path = tmp.name
+        self.backend.check(token)
+        self.stop()
+        sound = SoundLoader.load(temp_path)
+        if not sound:
+            raise RuntimeError("Failed to load audio.")
+        self._sound = sound
+        sound.bind(on_stop=lambda *args: self._remove(temp_path))
+        sound.play()
+
+    def _remove(self, temp_path):
+        try:
+            os.remove(temp_path)
+        except Exception:
+            pass